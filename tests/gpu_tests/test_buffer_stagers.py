@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import torch
+from torchsnapshot.batcher import GPUBatchedBufferStager
+from torchsnapshot.io_preparers.tensor import TensorBufferStager, TensorIOPreparer
+from torchsnapshot.serialization import tensor_from_memoryview
+
+_NUM_ELEMS = 1024 * 1024
+# Enough cycles to keep the source stream busy while the stager runs
+_SLEEP_CYCLES = 1_000_000_000
+
+
+def _prepare_stager(tensor: torch.Tensor, idx: int) -> TensorBufferStager:
+    _, write_reqs = TensorIOPreparer.prepare_write(
+        storage_path=f"tensor_{idx}", tensor=tensor, is_async_snapshot=True
+    )
+    return write_reqs[0].buffer_stager
+
+
+@pytest.mark.skipif(
+    not torch.cuda.is_available(), reason="This test requires GPU to run."
+)
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batched", [True, False])
+async def test_staging_on_non_default_stream(batched: bool) -> None:
+    """
+    Verify that the DtoH copy issued from an executor thread is ordered
+    against the work on the caller's (non-default) stream.
+    """
+    tensors = [
+        torch.zeros(_NUM_ELEMS, dtype=torch.float32, device="cuda") for _ in range(2)
+    ]
+    torch.cuda.synchronize()
+
+    stream = torch.cuda.Stream()
+    with torch.cuda.stream(stream):
+        # The stream is busy when the stagers are created and run. A copy
+        # that isn't ordered against the stream would observe zeros.
+        torch.cuda._sleep(_SLEEP_CYCLES)
+        for tensor in tensors:
+            tensor.fill_(42)
+        stagers = [_prepare_stager(tensor, idx) for idx, tensor in enumerate(tensors)]
+
+    if batched:
+        sz_bytes = _NUM_ELEMS * 4
+        stagers = [
+            GPUBatchedBufferStager(
+                byte_range_to_buffer_stager={
+                    (idx * sz_bytes, (idx + 1) * sz_bytes): stager
+                    for idx, stager in enumerate(stagers)
+                }
+            )
+        ]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        bufs = [await stager.stage_buffer(executor=executor) for stager in stagers]
+
+    # Work queued on the caller's stream afterwards must not affect the
+    # staged buffers
+    with torch.cuda.stream(stream):
+        for tensor in tensors:
+            tensor.fill_(7)
+
+    for stager in stagers:
+        await stager.synchronize()
+    staged = torch.cat(
+        [
+            tensor_from_memoryview(memoryview(buf), dtype=torch.float32, shape=[-1])
+            for buf in bufs
+        ]
+    )
+    assert torch.all(staged == 42)
+    for stager in stagers:
+        stager.release_buffer()
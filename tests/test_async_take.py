@@ -17,6 +17,7 @@ import torch.distributed.launcher as pet
 import torchsnapshot
 
 from torchsnapshot.io_types import WriteIO
+from torchsnapshot.knobs import override_snapshot_cpuset
 from torchsnapshot.snapshot import SNAPSHOT_METADATA_FNAME
 from torchsnapshot.storage_plugins.fs import FSStoragePlugin
 from torchsnapshot.test_utils import get_pet_launch_config
@@ -50,6 +51,13 @@ class AsyncTakeTest(unittest.TestCase):
                 path, {"foo": torch.nn.Linear(128, 64)}
             )
         tc.assertFalse(future.done())
+        tc.assertTrue(future.wait_done(timeout=120))
+        tc.assertTrue(future.done())
+        exc_type, exc, tb = future.exc_info
+        tc.assertIsInstance(exc, exc_type)
+        tc.assertIsNone(tb)
+        tc.assertIsNone(exc.__traceback__)
+        tc.assertIn("sorry", future.exc_info_str)
         with tc.assertRaisesRegex(RuntimeError, "sorry"):
             future.wait()
 
@@ -113,3 +121,32 @@ class AsyncTakeTest(unittest.TestCase):
                 )(path)
                 metadata_path = os.path.join(path, SNAPSHOT_METADATA_FNAME)
                 self.assertFalse(os.path.isfile(metadata_path))
+
+    def test_async_take_with_invalid_cpuset(self) -> None:
+        # Failing to deprioritize the commit thread shouldn't fail the snapshot
+        with tempfile.TemporaryDirectory() as path:
+            with override_snapshot_cpuset("0-3,"):
+                future = torchsnapshot.Snapshot.async_take(
+                    path, {"foo": torch.nn.Linear(128, 64)}
+                )
+                self.assertTrue(future.wait_done(timeout=120))
+                snapshot = future.wait()
+            self.assertTrue(os.path.isfile(os.path.join(path, SNAPSHOT_METADATA_FNAME)))
+            self.assertNotEqual(len(snapshot.get_manifest()), 0)
+
+    @staticmethod
+    def _test_async_take_preserves_pg(path: str) -> None:
+        tc = unittest.TestCase()
+
+        dist.init_process_group(backend="gloo")
+        future = torchsnapshot.Snapshot.async_take(
+            path, {"foo": torch.nn.Linear(128, 64)}
+        )
+        # The snapshot should hold the process group passed by the caller
+        # rather than the one used internally for the collectives
+        tc.assertIsNone(future.wait().pg)
+
+    def test_async_take_preserves_pg(self) -> None:
+        with tempfile.TemporaryDirectory() as path:
+            lc = get_pet_launch_config(nproc=2)
+            pet.elastic_launch(lc, entrypoint=self._test_async_take_preserves_pg)(path)
@@ -71,6 +71,15 @@ class DDPInferReplicatedTest(unittest.TestCase):
         )
         unittest.TestCase().assertCountEqual(expected_replicated, inferred_replicated)
 
+        # Buffers registered after the module is wrapped are picked up
+        model[1].register_buffer("foo", torch.zeros(1))
+        inferred_replicated = Snapshot._infer_replicated(
+            replicated=replicated, app_state=app_state
+        )
+        unittest.TestCase().assertCountEqual(
+            expected_replicated + ["ddp/module.1.foo"], inferred_replicated
+        )
+
     def test_with_params_to_ignore(self) -> None:
         lc = get_pet_launch_config(nproc=2)
         replicated = []
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import unittest
+
+import torch.distributed as dist
+import torch.distributed.launcher as pet
+from torchsnapshot.digest_cache import DigestCache
+from torchsnapshot.pg_wrapper import PGWrapper
+from torchsnapshot.test_utils import get_pet_launch_config
+
+
+class DigestCacheTest(unittest.TestCase):
+    def test_lookup(self) -> None:
+        pg = PGWrapper(pg=None)
+        cache: DigestCache[int] = DigestCache(max_size=8)
+        key, value, extras = cache.lookup(pg, b"foo", extra=b"bar")
+        self.assertEqual(key, (hashlib.sha1(b"foo").digest(),))
+        self.assertIsNone(value)
+        self.assertEqual(extras, [b"bar"])
+
+        cache.put(pg, key, 42)
+        self.assertEqual(cache.lookup(pg, b"foo")[1], 42)
+        self.assertIsNone(cache.lookup(pg, b"bar")[1])
+
+    def test_eviction(self) -> None:
+        pg = PGWrapper(pg=None)
+        cache: DigestCache[int] = DigestCache(max_size=2)
+        keys = {buf: cache.lookup(pg, buf)[0] for buf in [b"a", b"b", b"c"]}
+        cache.put(pg, keys[b"a"], 0)
+        cache.put(pg, keys[b"b"], 1)
+        # Updating an existing entry doesn't evict anything
+        cache.put(pg, keys[b"a"], 2)
+        self.assertEqual(cache.lookup(pg, b"a")[1], 2)
+        self.assertEqual(cache.lookup(pg, b"b")[1], 1)
+
+        # The least recently inserted entry is evicted
+        cache.put(pg, keys[b"c"], 3)
+        self.assertIsNone(cache.lookup(pg, b"a")[1])
+        self.assertEqual(cache.lookup(pg, b"b")[1], 1)
+        self.assertEqual(cache.lookup(pg, b"c")[1], 3)
+
+        cache.clear()
+        self.assertIsNone(cache.lookup(pg, b"b")[1])
+        self.assertIsNone(cache.lookup(pg, b"c")[1])
+
+    @staticmethod
+    def _test_multiple_pgs() -> None:
+        dist.init_process_group(backend="gloo")
+        tc = unittest.TestCase()
+        rank = dist.get_rank()
+        # pyre-fixme[6]: For 1st param expected `Optional[dist.ProcessGroup]` but
+        #  got `Optional[_distributed_c10d.ProcessGroup]`.
+        world = PGWrapper(pg=dist.group.WORLD)
+        subgroup = dist.new_group(ranks=[0, 1], backend="gloo")
+        cache: DigestCache[int] = DigestCache(max_size=1)
+
+        # The entry for the world process group survives the insertions for
+        # the subgroup, which only happen on a subset of the ranks
+        key, value, _ = cache.lookup(world, b"foo")
+        tc.assertIsNone(value)
+        cache.put(world, key, 42)
+        if rank in (0, 1):
+            sub = PGWrapper(pg=subgroup)
+            for idx in range(2):
+                key, value, _ = cache.lookup(sub, str(idx).encode())
+                tc.assertIsNone(value)
+                cache.put(sub, key, idx)
+        tc.assertEqual(cache.lookup(world, b"foo")[1], 42)
+
+        # If the caches of the ranks diverge, all ranks miss
+        if rank == 1:
+            cache.put(world, (b"bar",), 0)
+        tc.assertIsNone(cache.lookup(world, b"foo")[1])
+
+        # The ranks agree on cache hits again once the entry is re-inserted
+        key, value, _ = cache.lookup(world, b"foo")
+        tc.assertIsNone(value)
+        cache.put(world, key, 43)
+        tc.assertEqual(cache.lookup(world, b"foo")[1], 43)
+
+    def test_multiple_pgs(self) -> None:
+        lc = get_pet_launch_config(nproc=3)
+        pet.elastic_launch(lc, entrypoint=self._test_multiple_pgs)()
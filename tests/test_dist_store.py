@@ -13,6 +13,7 @@ import torch.distributed as dist
 import torch.distributed.launcher as pet
 from torchsnapshot.dist_store import create_store, get_or_create_store, LinearBarrier
 from torchsnapshot.pg_wrapper import PGWrapper
+from torchsnapshot.snapshot import Snapshot
 from torchsnapshot.test_utils import get_pet_launch_config
 
 
@@ -194,3 +195,70 @@ class DistStoreTest(unittest.TestCase):
     def test_linear_barrier_error(self) -> None:
         lc = get_pet_launch_config(nproc=4)
         pet.elastic_launch(lc, entrypoint=self._test_linear_barrier_error)()
+
+    @staticmethod
+    def _test_linear_barrier_cleanup() -> None:
+        dist.init_process_group(backend="gloo")
+        # pyre-fixme[6]: For 1st param expected `Optional[dist.ProcessGroup]` but
+        #  got `Optional[_distributed_c10d.ProcessGroup]`.
+        pg_wrapper = PGWrapper(pg=dist.group.WORLD)
+        rank = pg_wrapper.get_rank()
+        store = get_or_create_store(pg_wrapper=pg_wrapper)
+        tc = unittest.TestCase()
+
+        for prefix, error_rank in [("foo", None), ("bar", 0), ("baz", 1)]:
+            barrier = LinearBarrier(
+                prefix=prefix,
+                store=store,
+                rank=rank,
+                world_size=pg_wrapper.get_world_size(),
+                leader_rank=0,
+            )
+            try:
+                if rank == error_rank:
+                    barrier.report_error("sorry")
+                else:
+                    barrier.arrive(timeout=timedelta(seconds=5))
+                    barrier.depart(timeout=timedelta(seconds=5))
+            except RuntimeError:
+                pass
+
+            # The keys of the barrier are deleted once all ranks complete it
+            dist.barrier()
+            for key in [
+                barrier._key(rank=0),
+                barrier._num_arrived_key(),
+                barrier._all_arrived_key(),
+                barrier._num_errors_key(),
+                barrier._error_key(),
+                barrier._num_departed_key(),
+            ]:
+                tc.assertFalse(store.delete_key(key))
+
+    def test_linear_barrier_cleanup(self) -> None:
+        for nproc in [1, 2, 4]:
+            lc = get_pet_launch_config(nproc=nproc)
+            pet.elastic_launch(lc, entrypoint=self._test_linear_barrier_cleanup)()
+
+    @staticmethod
+    def _test_commit_barrier_seq() -> None:
+        dist.init_process_group(backend="gloo")
+        # pyre-fixme[6]: For 1st param expected `Optional[dist.ProcessGroup]` but
+        #  got `Optional[_distributed_c10d.ProcessGroup]`.
+        pg_wrapper = PGWrapper(pg=dist.group.WORLD)
+        tc = unittest.TestCase()
+
+        # Simulate a rank whose sequence number diverged from its peers'
+        if pg_wrapper.get_rank() == 1:
+            Snapshot._commit_barrier_seqs[(pg_wrapper.pg, "foo")] = 42
+        for _ in range(2):
+            barrier = Snapshot._create_commit_barrier(path="foo", pg_wrapper=pg_wrapper)
+            prefixes = [None] * pg_wrapper.get_world_size()
+            pg_wrapper.all_gather_object(obj_list=prefixes, obj=barrier.prefix)
+            tc.assertEqual(len(set(prefixes)), 1)
+            barrier.arrive(timeout=timedelta(seconds=5))
+            barrier.depart(timeout=timedelta(seconds=5))
+
+    def test_commit_barrier_seq(self) -> None:
+        lc = get_pet_launch_config(nproc=2)
+        pet.elastic_launch(lc, entrypoint=self._test_commit_barrier_seq)()
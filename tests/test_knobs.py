@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import unittest
+
+from torchsnapshot.knobs import get_snapshot_cpuset, override_snapshot_cpuset
+
+
+class KnobsTest(unittest.TestCase):
+    def test_get_snapshot_cpuset(self) -> None:
+        self.assertIsNone(get_snapshot_cpuset())
+        with override_snapshot_cpuset("3"):
+            self.assertEqual(get_snapshot_cpuset(), {3})
+        with override_snapshot_cpuset("0-3,8,10-11"):
+            self.assertEqual(get_snapshot_cpuset(), {0, 1, 2, 3, 8, 10, 11})
+
+    def test_get_snapshot_cpuset_invalid(self) -> None:
+        for cpuset in ["0-3,", "a", "1-2-3", ""]:
+            with override_snapshot_cpuset(cpuset):
+                with self.assertRaisesRegex(ValueError, "Invalid cpuset"):
+                    get_snapshot_cpuset()
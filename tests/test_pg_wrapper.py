@@ -14,7 +14,7 @@ import torch
 
 import torch.distributed as dist
 import torch.distributed.launcher as pet
-from torchsnapshot.pg_wrapper import PGWrapper
+from torchsnapshot.pg_wrapper import get_or_create_gloo_pg, PGWrapper
 from torchsnapshot.test_utils import get_pet_launch_config
 
 
@@ -33,6 +33,29 @@ class TestPGWrapper(unittest.TestCase):
         rank = dist.get_rank()
         tc.assertEqual(output_list, [input_list[rank]])
 
+        obj_list = [None] * dist.get_world_size() if rank == 0 else None
+        pg_wrapper.gather_object(obj=input_list[rank], obj_list=obj_list)
+        if rank == 0:
+            tc.assertEqual(obj_list, input_list)
+
+        gloo_pg = get_or_create_gloo_pg(pg=None)
+        tc.assertEqual(dist.get_backend(gloo_pg), "gloo")
+        tc.assertIs(get_or_create_gloo_pg(pg=None), gloo_pg)
+        if backend == "gloo":
+            tc.assertIs(gloo_pg, dist.group.WORLD)
+
+        bufs = [b"", b"foo", b"quazquazquaz"]
+        tc.assertEqual(pg_wrapper.all_gather_bytes(bufs[rank]), bufs)
+        digests = [bytes([r]) * 20 for r in range(dist.get_world_size())]
+        tc.assertEqual(pg_wrapper.all_gather_digest(digests[rank]), digests)
+        tc.assertEqual(
+            pg_wrapper.gather_bytes(bufs[rank], dst=1), bufs if rank == 1 else None
+        )
+        tc.assertEqual(
+            pg_wrapper.broadcast_bytes(bufs[rank] if rank == 2 else None, src=2),
+            bufs[2],
+        )
+
     def test_scatter_obj_list_gloo(self) -> None:
         lc = get_pet_launch_config(nproc=3)
         pet.elastic_launch(lc, entrypoint=self._worker)("gloo")
@@ -48,3 +71,19 @@ class TestPGWrapper(unittest.TestCase):
         input_list = [["foo"]]
         pg_wrapper.scatter_object_list(output_list=output_list, input_list=input_list)
         self.assertEqual(output_list, [input_list[0]])
+
+    def test_gather_object_dist_uninitialized(self) -> None:
+        pg_wrapper = PGWrapper(pg=None)
+        obj_list = [None]
+        pg_wrapper.gather_object(obj=["foo"], obj_list=obj_list)
+        self.assertEqual(obj_list, [["foo"]])
+
+    def test_get_or_create_gloo_pg_dist_uninitialized(self) -> None:
+        self.assertIsNone(get_or_create_gloo_pg(pg=None))
+
+    def test_bytes_collectives_dist_uninitialized(self) -> None:
+        pg_wrapper = PGWrapper(pg=None)
+        self.assertEqual(pg_wrapper.all_gather_bytes(b"foo"), [b"foo"])
+        self.assertEqual(pg_wrapper.all_gather_digest(b"foo"), [b"foo"])
+        self.assertEqual(pg_wrapper.gather_bytes(b"foo"), [b"foo"])
+        self.assertEqual(pg_wrapper.broadcast_bytes(b"foo"), b"foo")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import Executor
+from typing import Optional
+
+from torchsnapshot.io_types import BufferStager, WriteIO, WriteReq
+from torchsnapshot.pinned_buffer_pool import PinnedBufferPool
+from torchsnapshot.scheduler import sync_execute_write_reqs
+from torchsnapshot.storage_plugins.fs import FSStoragePlugin
+
+
+class PinnedBufferPoolTest(unittest.TestCase):
+    def test_pinned_buffer_pool(self) -> None:
+        pool = PinnedBufferPool(capacity_bytes=1024)
+
+        buf = pool.acquire(300)
+        self.assertIsNotNone(buf)
+        self.assertEqual(buf.nelement(), 512)
+
+        # Exceeds the capacity of the pool
+        self.assertIsNone(pool.acquire(600))
+
+        other_buf = pool.acquire(400)
+        self.assertIsNotNone(other_buf)
+        self.assertIsNot(other_buf, buf)
+        self.assertIsNone(pool.acquire(1))
+
+        # Released buffers are reused for requests in the same bucket
+        pool.release(buf)
+        self.assertIs(pool.acquire(257), buf)
+
+    def test_clear(self) -> None:
+        pool = PinnedBufferPool(capacity_bytes=1024)
+        buf = pool.acquire(512)
+        other_buf = pool.acquire(512)
+        self.assertIsNone(pool.acquire(1))
+
+        # Only the released buffers are freed
+        pool.release(buf)
+        pool.clear()
+        new_buf = pool.acquire(512)
+        self.assertIsNotNone(new_buf)
+        self.assertIsNot(new_buf, buf)
+        self.assertIsNone(pool.acquire(1))
+
+        pool.release(other_buf)
+        pool.release(new_buf)
+        pool.clear()
+        self.assertIsNotNone(pool.acquire(1024))
+
+    def test_eviction(self) -> None:
+        pool = PinnedBufferPool(capacity_bytes=1024)
+        buf = pool.acquire(512)
+        small_buf = pool.acquire(256)
+        other_small_buf = pool.acquire(256)
+        self.assertIsNotNone(other_small_buf)
+        pool.release(small_buf)
+        pool.release(buf)
+
+        # The free buffers of the least recently used bucket are evicted to
+        # make room for a new bucket
+        self.assertIsNotNone(pool.acquire(128))
+        self.assertEqual(pool.allocated_bytes, 1024 - 256 + 128)
+        self.assertIs(pool.acquire(512), buf)
+
+        # Buffers that are acquired are never evicted
+        self.assertIsNone(pool.acquire(1024))
+
+    def test_release_idle_buffers(self) -> None:
+        pool = PinnedBufferPool(capacity_bytes=1024)
+        buf = pool.acquire(512)
+        other_buf = pool.acquire(256)
+        pool.release(buf)
+        pool.release(other_buf)
+        # Both buckets were acquired from since the pool was created
+        pool.release_idle_buffers()
+        self.assertEqual(pool.allocated_bytes, 768)
+
+        self.assertIs(pool.acquire(512), buf)
+        pool.release(buf)
+        # Only the buffers of the idle bucket are freed
+        pool.release_idle_buffers()
+        self.assertEqual(pool.allocated_bytes, 512)
+        self.assertIs(pool.acquire(512), buf)
+
+    def test_release_on_failed_write(self) -> None:
+        pool = PinnedBufferPool(capacity_bytes=1024)
+
+        class _Stager(BufferStager):
+            async def stage_buffer(self, executor: Optional[Executor] = None) -> bytes:
+                self.buf = pool.acquire(1024)
+                return b"foo"
+
+            def get_staging_cost_bytes(self) -> int:
+                return 3
+
+            def release_buffer(self) -> None:
+                pool.release(self.buf)
+
+        class _FaultyStoragePlugin(FSStoragePlugin):
+            async def write(self, write_io: WriteIO) -> None:
+                raise Exception("sorry")
+
+        event_loop = asyncio.new_event_loop()
+        with tempfile.TemporaryDirectory() as path:
+            pending_io_work = sync_execute_write_reqs(
+                write_reqs=[WriteReq(path="foo", buffer_stager=_Stager())],
+                storage=_FaultyStoragePlugin(root=path),
+                memory_budget_bytes=1024,
+                rank=0,
+                event_loop=event_loop,
+            )
+            with self.assertRaisesRegex(Exception, "sorry"):
+                pending_io_work.sync_complete(event_loop=event_loop)
+        event_loop.close()
+        # The buffer is returned to the pool despite the failure
+        self.assertIsNotNone(pool.acquire(1024))
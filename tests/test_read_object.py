@@ -67,6 +67,9 @@ class ReadObjectTest(unittest.TestCase):
                 path=path, app_state={"state": torchsnapshot.StateDict(foo=foo)}
             )
             snapshot.read_object("0/state/foo", obj_out=bar)
+            # The snapshot is located in rank 0's temporary directory. Make
+            # sure all ranks are done reading before it's removed.
+            dist.barrier()
 
         for foo_shard, bar_shard in zip(foo.local_shards(), bar.local_shards()):
             tc.assertTrue(torch.allclose(foo_shard.tensor, bar_shard.tensor))
@@ -72,15 +72,33 @@ def test_replication_glob(
 ) -> None:
     dist.init_process_group(backend="gloo")
     app_state = {"my_stateful": _TestStateful()}
+    # The second snapshot reuses the replicated paths resolved for the first one
+    for idx in range(2):
+        snapshot = Snapshot.take(
+            path=str(tmp_path / str(idx)),
+            app_state=app_state,
+            replicated=replication_globs[dist.get_rank()],
+        )
+        replicated_paths = [
+            path
+            for path, entry in snapshot.get_manifest().items()
+            if is_replicated(entry)
+        ]
+        assert set(replicated_paths) == set(expected_replicated_paths)
+
+
+@run_with_pet(nproc=_WORLD_SIZE)
+def test_inconsistent_paths(tmp_path: Path) -> None:
+    dist.init_process_group(backend="gloo")
+    app_state = {"my_stateful": _TestStateful()}
+    # The path specified by rank 0 is used by all ranks
     snapshot = Snapshot.take(
-        path=str(tmp_path),
+        path=str(tmp_path / str(dist.get_rank())),
         app_state=app_state,
-        replicated=replication_globs[dist.get_rank()],
+        replicated=["**"],
     )
-    replicated_paths = [
-        path for path, entry in snapshot.get_manifest().items() if is_replicated(entry)
-    ]
-    assert set(replicated_paths) == set(expected_replicated_paths)
+    assert snapshot.path == str(tmp_path / "0")
+    assert len(snapshot.get_manifest()) != 0
 
 
 @pytest.mark.parametrize(
@@ -107,6 +125,7 @@ def test_replication_glob(
             ],
             [],
         ),
+        ([], []),
     ],
 )
 def test_coalesce_replicated(
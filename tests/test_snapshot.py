@@ -5,9 +5,12 @@
 # This source code is licensed under the BSD-style license found in the
 # LICENSE file in the root directory of this source tree.
 
+import asyncio
 import copy
+import gc
 from pathlib import Path
 from typing import Any, Dict, List
+from unittest.mock import patch
 
 import pytest
 
@@ -56,6 +59,55 @@ def test_nn_linear(tmp_path: Path) -> None:
     assert check_state_dict_eq(foo.state_dict(), bar.state_dict())
 
 
+def test_snapshot_close(tmp_path: Path) -> None:
+    foo = torch.nn.Linear(128, 64)
+    bar = torch.nn.Linear(128, 64)
+    Snapshot.take(str(tmp_path), {"foo": foo})
+
+    with Snapshot(path=str(tmp_path)) as snapshot:
+        weight = snapshot.read_object("0/foo/weight")
+        snapshot.restore({"foo": bar})
+        assert snapshot._event_loop is not None
+    assert snapshot._event_loop is None
+    assert torch.allclose(weight, foo.weight)
+    assert check_state_dict_eq(foo.state_dict(), bar.state_dict())
+
+    # The snapshot remains usable after being closed
+    snapshot.restore({"foo": bar})
+    snapshot.close()
+
+
+def test_snapshot_closed_on_gc(tmp_path: Path) -> None:
+    foo = torch.nn.Linear(128, 64)
+    Snapshot.take(str(tmp_path), {"foo": foo})
+
+    snapshot = Snapshot(path=str(tmp_path))
+    snapshot.restore({"foo": foo})
+    event_loop = snapshot._event_loop
+    assert event_loop is not None and not event_loop.is_closed()
+    del snapshot
+    gc.collect()
+    assert event_loop.is_closed()
+
+
+def test_take_closes_event_loop_on_failure(tmp_path: Path) -> None:
+    event_loops = []
+    new_event_loop = asyncio.new_event_loop
+
+    def _new_event_loop() -> asyncio.AbstractEventLoop:
+        event_loop = new_event_loop()
+        event_loops.append(event_loop)
+        return event_loop
+
+    with patch("asyncio.new_event_loop", _new_event_loop), patch.object(
+        Snapshot, "_take_impl", side_effect=RuntimeError("sorry")
+    ):
+        with pytest.raises(RuntimeError, match="sorry"):
+            Snapshot.take(str(tmp_path), {"foo": torch.nn.Linear(128, 64)})
+    assert len(event_loops) == 1
+    assert event_loops[0].is_closed()
+
+
 @pytest.mark.usefixtures("toggle_batching")
 def test_nn_sequential(tmp_path: Path) -> None:
     foo = torch.nn.Sequential(
@@ -16,10 +16,12 @@ from typing import cast, Dict, Iterator, List, Optional, Tuple
 import torch
 
 from .io_preparer import TensorBufferStager
+from .io_preparers.tensor import copy_to_host_async, wait_for_copy
 
 from .io_types import BufferConsumer, BufferStager, BufferType, ReadReq, WriteReq
 from .knobs import get_slab_size_threshold_bytes
 from .manifest import ChunkedTensorEntry, Entry, ShardedTensorEntry, TensorEntry
+from .pinned_buffer_pool import get_pinned_buffer_pool
 from .serialization import (
     contiguous_view_as_untyped_storage,
     Serializer,
@@ -66,29 +68,55 @@ class BatchedBufferStager(BufferStager):
         staging_tasks = set()
 
         for byte_range, buffer_stager in self.byte_range_to_buffer_stager.items():
-            task = asyncio.create_task(buffer_stager.stage_buffer(executor=executor))
+            task = asyncio.create_task(
+                self._stage_and_synchronize(
+                    buffer_stager=buffer_stager, executor=executor
+                )
+            )
             staging_task_to_byte_range[task] = byte_range
             staging_tasks.add(task)
 
-        while len(staging_tasks) != 0:
-            done, _ = await asyncio.wait(
-                staging_tasks, return_when=asyncio.FIRST_COMPLETED
-            )
-            for task in done:
-                staging_tasks.remove(task)
-                buf = task.result()
-                byte_range = staging_task_to_byte_range[task]
-                if len(buf) != byte_range[1] - byte_range[0]:
-                    # Just to be defensive
-                    raise AssertionError(
-                        "The size of the buffer generated by the buffer stager "
-                        "does not match with the byte range associated with the "
-                        "buffer stager. "
-                        f"Buffer size: {len(buf)}, byte range: {byte_range}."
-                    )
-                slab[byte_range[0] : byte_range[1]] = buf
+        try:
+            while len(staging_tasks) != 0:
+                done, _ = await asyncio.wait(
+                    staging_tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    staging_tasks.remove(task)
+                    buf = task.result()
+                    byte_range = staging_task_to_byte_range[task]
+                    if len(buf) != byte_range[1] - byte_range[0]:
+                        # Just to be defensive
+                        raise AssertionError(
+                            "The size of the buffer generated by the buffer stager "
+                            "does not match with the byte range associated with the "
+                            "buffer stager. "
+                            f"Buffer size: {len(buf)}, byte range: {byte_range}."
+                        )
+                    slab[byte_range[0] : byte_range[1]] = buf
+                    self.byte_range_to_buffer_stager[byte_range].release_buffer()
+        finally:
+            # If a staging task failed, let the remaining ones settle before
+            # releasing their buffers, since they may still acquire one
+            if len(staging_tasks) != 0:
+                await asyncio.wait(staging_tasks)
+                for task in staging_tasks:
+                    if not task.cancelled():
+                        # Mark the exception as retrieved
+                        task.exception()
+            for buffer_stager in self.byte_range_to_buffer_stager.values():
+                buffer_stager.release_buffer()
         return memoryview(slab)
 
+    @staticmethod
+    async def _stage_and_synchronize(
+        buffer_stager: BufferStager, executor: Optional[Executor]
+    ) -> BufferType:
+        # The staged buffer is copied into the slab right away
+        buf = await buffer_stager.stage_buffer(executor=executor)
+        await buffer_stager.synchronize()
+        return buf
+
     def get_staging_cost_bytes(self) -> int:
         return (
             sum(
@@ -137,27 +165,66 @@ class GPUBatchedBufferStager(BatchedBufferStager):
         self.byte_range_to_buffer_stager: Dict[
             Tuple[int, int], TensorBufferStager
         ] = cast(Dict[Tuple[int, int], TensorBufferStager], byte_range_to_buffer_stager)
+        self._pinned_buf: Optional[torch.Tensor] = None
+        self._copy_event: Optional[torch.cuda.Event] = None
+        # The streams captured by the encapsulated buffer stagers on the
+        # caller's thread. The slab is assembled and copied on the first one.
+        self._source_streams: List[torch.cuda.Stream] = []
+        for buffer_stager in self.byte_range_to_buffer_stager.values():
+            stream = cast(torch.cuda.Stream, buffer_stager.source_stream)
+            if stream not in self._source_streams:
+                self._source_streams.append(stream)
 
     async def stage_buffer(self, executor: Optional[Executor] = None) -> BufferType:
+        stream, other_streams = self._source_streams[0], self._source_streams[1:]
+        for other_stream in other_streams:
+            stream.wait_stream(other_stream)
+
+        # Don't await within the stream context, as it's local to the thread
+        # rather than to this coroutine
+        with torch.cuda.stream(stream):
+            gpu_buf = self._assemble_gpu_slab()
+
+        if gpu_buf is None:
+            return await super().stage_buffer(executor=executor)
+
+        pinned_buf = get_pinned_buffer_pool().acquire(self.slab_sz_bytes)
+        if pinned_buf is None:
+            with torch.cuda.stream(stream):
+                return tensor_as_memoryview(gpu_buf.cpu())
+        self._pinned_buf = pinned_buf
+        cpu_buf = pinned_buf[: self.slab_sz_bytes]
+        self._copy_event = copy_to_host_async(dst=cpu_buf, src=gpu_buf, stream=stream)
+        for other_stream in other_streams:
+            other_stream.wait_event(self._copy_event)
+        return tensor_as_memoryview(cpu_buf)
+
+    def _assemble_gpu_slab(self) -> Optional[torch.Tensor]:
         try:
             # pyre-ignore
             gpu_buf = torch.cuda.ByteTensor(self.slab_sz_bytes)
         except torch.cuda.OutOfMemoryError:
-            gpu_buf = None
-
-        if gpu_buf is None:
-            return await super().stage_buffer(executor=executor)
+            return None
 
         buf_storage = contiguous_view_as_untyped_storage(gpu_buf)
         for byte_range, buffer_stager in self.byte_range_to_buffer_stager.items():
             tensor = buffer_stager.tensor.contiguous()
             tensor_storage = contiguous_view_as_untyped_storage(tensor)
             buf_storage[byte_range[0] : byte_range[1]].copy_(tensor_storage)
-        return tensor_as_memoryview(gpu_buf.cpu())
+        return gpu_buf
 
     def get_staging_cost_bytes(self) -> int:
         return self.slab_sz_bytes
 
+    async def synchronize(self) -> None:
+        event, self._copy_event = self._copy_event, None
+        await wait_for_copy(event)
+
+    def release_buffer(self) -> None:
+        if self._pinned_buf is not None:
+            get_pinned_buffer_pool().release(self._pinned_buf)
+            self._pinned_buf = None
+
 
 class SlabType(Enum):
     CPU = 0
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import hashlib
+import weakref
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+import torch.distributed as dist
+
+from .pg_wrapper import PGWrapper
+
+T = TypeVar("T")
+
+DigestCacheKey = Tuple[bytes, ...]
+
+_DIGEST_SIZE_BYTES: int = hashlib.sha1().digest_size
+
+
+class _DigestCacheState(Generic[T]):
+    def __init__(self) -> None:
+        self.entries: Dict[DigestCacheKey, T] = {}
+        # Identifies the history of insertions since the last reset. Since
+        # eviction is deterministic, ranks with the same history hold the same
+        # entries.
+        self.history_digest: bytes = bytes(_DIGEST_SIZE_BYTES)
+
+    def reset(self) -> None:
+        self.entries.clear()
+        self.history_digest = bytes(_DIGEST_SIZE_BYTES)
+
+
+class DigestCache(Generic[T]):
+    """
+    A bounded cache for results that are a deterministic function of per-rank
+    inputs, keyed by the digests of the inputs gathered from all ranks.
+
+    Repeated snapshots of the same program state only need to exchange the
+    fixed-size digests instead of the inputs themselves.
+
+    The ranks must agree on cache hits, since a hit skips the collectives that
+    would otherwise compute the result. Thus a separate cache is kept for each
+    process group, and the digest of each rank's cache history is gathered
+    along with the key. If the histories diverged (e.g. a rank failed midway
+    through a snapshot), all ranks treat the lookup as a miss and reset their
+    caches for the process group.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._pg_to_state: "weakref.WeakKeyDictionary[dist.ProcessGroup, _DigestCacheState[T]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._no_pg_state: _DigestCacheState[T] = _DigestCacheState()
+
+    def lookup(
+        self, pg: PGWrapper, buf: bytes, extra: bytes = b""
+    ) -> Tuple[DigestCacheKey, Optional[T], List[bytes]]:
+        """
+        Look up the result for the per-rank inputs. This is a collective.
+
+        Args:
+            pg: The process group the result is computed over.
+            buf: The serialized input of the current rank.
+            extra: Additional fixed-size bytes to gather along with the key.
+                All ranks must pass the same number of bytes.
+
+        Returns:
+            The cache key, the cached result (None on a miss), and the
+            ``extra`` of each rank.
+        """
+        state = self._get_state(pg)
+        gathered = pg.all_gather_digest(
+            state.history_digest + hashlib.sha1(buf).digest() + extra
+        )
+        key_end = 2 * _DIGEST_SIZE_BYTES
+        key = tuple(g[_DIGEST_SIZE_BYTES:key_end] for g in gathered)
+        extras = [g[key_end:] for g in gathered]
+        if any(g[:_DIGEST_SIZE_BYTES] != state.history_digest for g in gathered):
+            state.reset()
+            return key, None, extras
+        return key, state.entries.get(key), extras
+
+    def put(self, pg: PGWrapper, key: DigestCacheKey, value: T) -> None:
+        state = self._get_state(pg)
+        if key not in state.entries and len(state.entries) >= self.max_size:
+            # Evict the least recently inserted entry
+            del state.entries[next(iter(state.entries))]
+        state.entries[key] = value
+        state.history_digest = hashlib.sha1(
+            state.history_digest + b"".join(key)
+        ).digest()
+
+    def clear(self) -> None:
+        self._pg_to_state.clear()
+        self._no_pg_state.reset()
+
+    def _get_state(self, pg: PGWrapper) -> _DigestCacheState[T]:
+        if pg.pg is None:
+            return self._no_pg_state
+        state = self._pg_to_state.get(pg.pg)
+        if state is None:
+            state = _DigestCacheState()
+            self._pg_to_state[pg.pg] = state
+        return state
@@ -104,6 +104,9 @@ class LinearBarrier:
     rank to perform some actions in-between the two stages, with the knowledge
     that all ranks have arrived at the barrier, while holding other ranks in
     the barrier.
+
+    The keys of the barrier are deleted from the store by the last rank to
+    complete the barrier, either by departing or by reporting an error.
     """
 
     def __init__(
@@ -136,19 +139,17 @@ class LinearBarrier:
         self.arrived = True
 
         if self.rank == self.leader_rank:
-            peer_keys = [
-                self._key(rank=rank)
-                for rank in range(self.world_size)
-                if rank != self.leader_rank
-            ]
-            self.store.wait(peer_keys, timeout)
-            for key in peer_keys:
-                err = self.store.get(key)
-                if len(err) != 0:
-                    self.report_error(err=str(err))
-                    raise RuntimeError(str(err))
+            # Instead of waiting for and reading a key per peer, wait for the
+            # last non-leader rank to signal that all peers have arrived, and
+            # only read the error key if any peer reported an error.
+            if self.world_size > 1:
+                self.store.wait([self._all_arrived_key()], timeout)
+            if self.store.add(self._num_errors_key(), 0) != 0:
+                err = self.store.get(self._error_key())
+                self.report_error(err=str(err))
+                raise RuntimeError(str(err))
         else:
-            self.store.set(self._key(rank=self.rank), "")
+            self._signal_arrival()
 
     def depart(self, timeout: timedelta) -> None:
         """
@@ -163,14 +164,15 @@ class LinearBarrier:
             )
         if self.departed:
             raise RuntimeError("Can't call .depart() on a completed barrier.")
-        self.arrived = True
 
         if self.rank == self.leader_rank:
             self.store.set(self._key(self.leader_rank), "")
+            self._signal_departure()
         else:
             leader_key = self._key(rank=self.leader_rank)
             self.store.wait([leader_key], timeout)
             err = self.store.get(leader_key)
+            self._signal_departure()
             if len(err) != 0:
                 raise RuntimeError(str(err))
 
@@ -185,12 +187,71 @@ class LinearBarrier:
             will be received by the leader rank in .arrive() and non-leader ranks
             in .depart().
 
+        Reporting an error completes the barrier for the current rank. Errors
+        reported after the current rank has completed the barrier are ignored.
+
         Args:
             err: The error to be propagated to peer ranks.
         """
-        self.store.set(
-            self._key(self.rank), f"Rank {self.rank} encountered error: {err}"
-        )
+        if self.departed:
+            return
+        err = f"Rank {self.rank} encountered error: {err}"
+        if self.rank == self.leader_rank:
+            self.store.set(self._key(self.rank), err)
+        else:
+            self.store.set(self._error_key(), err)
+            self.store.add(self._num_errors_key(), 1)
+            # A non-leader rank that fails before arriving won't arrive at the
+            # barrier. Count it as arrived so that the leader rank wakes up and
+            # observes the error.
+            if not self.arrived:
+                self.arrived = True
+                self._signal_arrival()
+        self._signal_departure()
+
+    def cleanup(self) -> None:
+        """
+        Delete the keys of the barrier from the store.
+
+        This must only be called once all ranks have completed the barrier.
+        """
+        for key in (
+            self._key(self.leader_rank),
+            self._num_arrived_key(),
+            self._all_arrived_key(),
+            self._num_errors_key(),
+            self._error_key(),
+            self._num_departed_key(),
+        ):
+            self.store.delete_key(key)
+
+    def _signal_arrival(self) -> None:
+        num_arrived = self.store.add(self._num_arrived_key(), 1)
+        if num_arrived == self.world_size - 1:
+            self.store.set(self._all_arrived_key(), "")
+
+    def _signal_departure(self) -> None:
+        # The current rank must not access the store for the barrier after
+        # this point, since the keys may be deleted by the last rank to depart
+        self.departed = True
+        num_departed = self.store.add(self._num_departed_key(), 1)
+        if num_departed == self.world_size:
+            self.cleanup()
 
     def _key(self, rank: int) -> str:
         return f"{self.prefix}_{rank}"
+
+    def _num_arrived_key(self) -> str:
+        return f"{self.prefix}_num_arrived"
+
+    def _all_arrived_key(self) -> str:
+        return f"{self.prefix}_all_arrived"
+
+    def _num_errors_key(self) -> str:
+        return f"{self.prefix}_num_errors"
+
+    def _error_key(self) -> str:
+        return f"{self.prefix}_error"
+
+    def _num_departed_key(self) -> str:
+        return f"{self.prefix}_num_departed"
@@ -10,10 +10,11 @@
 import asyncio
 import logging
 import math
+import threading
 from concurrent.futures import Executor
 from functools import reduce
 from operator import mul
-from typing import Any, Callable, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Callable, cast, Dict, List, Optional, Tuple, TypeVar, Union
 
 import torch
 
@@ -26,6 +27,7 @@ from torchsnapshot.io_types import (
     WriteReq,
 )
 from torchsnapshot.manifest import ChunkedTensorEntry, TensorEntry
+from torchsnapshot.pinned_buffer_pool import get_pinned_buffer_pool
 
 from torchsnapshot.serialization import (
     BUFFER_PROTOCOL_SUPPORTED_DTYPES,
@@ -234,6 +236,30 @@ class TensorBufferStager(BufferStager):
         self.entry = entry
         self.is_async_snapshot = is_async_snapshot
         self._tensor_prepare_func = _tensor_prepare_func
+        self._pinned_buf: Optional[torch.Tensor] = None
+        self._copy_event: Optional[torch.cuda.Event] = None
+        # The staging may happen in executor threads, whose current stream is
+        # the default stream rather than the one the caller is using. Capture
+        # the caller's stream so that the DtoH copy is ordered against the
+        # work on it. The stream is kept as plain data so that the stager
+        # remains copyable.
+        self._source_stream_data: Optional[Tuple[int, int, int]] = None
+        if tensor.is_cuda:
+            stream = torch.cuda.current_stream(tensor.device)
+            self._source_stream_data = (
+                stream.stream_id,
+                stream.device_index,
+                stream.device_type,
+            )
+
+    @property
+    def source_stream(self) -> Optional[torch.cuda.Stream]:
+        if self._source_stream_data is None:
+            return None
+        stream_id, device_index, device_type = self._source_stream_data
+        return torch.cuda.Stream(
+            stream_id=stream_id, device_index=device_index, device_type=device_type
+        )
 
     async def stage_buffer(self, executor: Optional[Executor] = None) -> BufferType:
         is_tensor_custom_prepared = False
@@ -245,13 +271,22 @@ class TensorBufferStager(BufferStager):
                 is_tensor_custom_prepared = True
 
         if self.tensor.is_cuda:
-            # It would be nice to copy from GPU via DMA. However, it is very
-            # difficult to figure out the safe amount of page-locked memory
-            # that we can use. For now, we'll resort to a thread pool for
-            # concurrent DtoH copy (with GIL released).
-            cpu_tensor = await _run_in_executor(
-                executor, tensor_to_cpu, self.tensor.detach()
-            )
+            # Copy from GPU via DMA into a page-locked buffer from the pool if
+            # possible. The copy is issued on a side stream without blocking
+            # and is waited on in .synchronize(). Otherwise, the copies are
+            # dispatched to a thread pool for concurrency (with GIL released).
+            cpu_tensor = None
+            if (
+                self._tensor_prepare_func is None
+                and self.entry.serializer == Serializer.BUFFER_PROTOCOL.value
+            ):
+                cpu_tensor = await _run_in_executor(
+                    executor, self._copy_to_pinned_buffer, self.tensor.detach()
+                )
+            if cpu_tensor is None:
+                cpu_tensor = await _run_in_executor(
+                    executor, self._copy_to_cpu, self.tensor.detach()
+                )
         else:
             cpu_tensor = self.tensor
             if is_uvm_tensor(cpu_tensor):
@@ -268,6 +303,33 @@ class TensorBufferStager(BufferStager):
         else:
             raise ValueError(f"Unrecognized serializer: {self.entry.serializer}.")
 
+    async def synchronize(self) -> None:
+        event, self._copy_event = self._copy_event, None
+        await wait_for_copy(event)
+
+    def release_buffer(self) -> None:
+        if self._pinned_buf is not None:
+            get_pinned_buffer_pool().release(self._pinned_buf)
+            self._pinned_buf = None
+
+    def _copy_to_pinned_buffer(self, tensor: torch.Tensor) -> Optional[torch.Tensor]:
+        tensor_sz_bytes = tensor.nelement() * tensor.element_size()
+        pinned_buf = get_pinned_buffer_pool().acquire(tensor_sz_bytes)
+        if pinned_buf is None:
+            return None
+        self._pinned_buf = pinned_buf
+        cpu_tensor = pinned_buf[:tensor_sz_bytes].view(tensor.dtype).view(tensor.shape)
+        self._copy_event = copy_to_host_async(
+            dst=cpu_tensor,
+            src=tensor,
+            stream=cast(torch.cuda.Stream, self.source_stream),
+        )
+        return cpu_tensor
+
+    def _copy_to_cpu(self, tensor: torch.Tensor) -> torch.Tensor:
+        with torch.cuda.stream(self.source_stream):
+            return tensor_to_cpu(tensor)
+
     def get_staging_cost_bytes(self) -> int:
         tensor_sz_bytes = TensorIOPreparer.get_tensor_size_from_entry(self.entry)
         if self.entry.serializer == Serializer.TORCH_SAVE.value:
@@ -353,6 +415,58 @@ def tensor_to_cpu(tensor: torch.Tensor) -> torch.Tensor:
     return tensor.to("cpu")  # pragma: no cover
 
 
+_copy_streams: Dict[torch.device, torch.cuda.Stream] = {}
+_copy_streams_lock = threading.Lock()
+
+
+def _get_copy_stream(device: torch.device) -> torch.cuda.Stream:
+    with _copy_streams_lock:
+        if device not in _copy_streams:
+            _copy_streams[device] = torch.cuda.Stream(device=device)
+        return _copy_streams[device]
+
+
+def copy_to_host_async(
+    dst: torch.Tensor, src: torch.Tensor, stream: torch.cuda.Stream
+) -> torch.cuda.Event:
+    """
+    Copy a CUDA tensor into a pinned CPU tensor on a side stream without
+    blocking the host.
+
+    The copy is ordered after the work already queued on ``stream``, and the
+    work queued on ``stream`` afterwards is ordered after the copy. Thus the
+    copy observes the values at the time of the call, even if the source
+    tensor is modified right after.
+
+    Args:
+        dst: The pinned CPU tensor to copy into.
+        src: The CUDA tensor to copy from.
+        stream: The stream on which the source tensor is produced and
+            consumed. Note that this function may be called from a thread
+            whose current stream is different.
+
+    Returns:
+        A CUDA event recorded after the copy.
+    """
+    copy_stream = _get_copy_stream(src.device)
+    copy_stream.wait_stream(stream)
+    with torch.cuda.stream(copy_stream):
+        dst.copy_(src, non_blocking=True)
+        event = torch.cuda.Event()
+        event.record(copy_stream)
+    # Prevent the caching allocator from reusing the source's memory before
+    # the copy completes
+    src.record_stream(copy_stream)
+    stream.wait_event(event)
+    return event
+
+
+async def wait_for_copy(event: Optional[torch.cuda.Event]) -> None:
+    if event is None or event.query():
+        return
+    await asyncio.get_running_loop().run_in_executor(None, event.synchronize)
+
+
 @torch.jit.script
 def _tensor_copy(dst: torch.Tensor, src: torch.Tensor) -> None:
     dst.detach().copy_(src)  # pragma: no cover
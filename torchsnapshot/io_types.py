@@ -25,6 +25,21 @@ class BufferStager:
     def get_staging_cost_bytes(self) -> int:
         pass
 
+    async def synchronize(self) -> None:
+        """
+        Called before the staged buffer is consumed. Buffer stagers that stage
+        asynchronously (e.g. via non-blocking DtoH copies) wait for the staging
+        to complete here.
+        """
+        pass
+
+    def release_buffer(self) -> None:
+        """
+        Called once the staged buffer has been consumed. Buffer stagers that
+        stage into reusable memory can reclaim it here.
+        """
+        pass
+
 
 @dataclass
 class WriteReq:
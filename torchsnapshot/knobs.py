@@ -8,7 +8,7 @@
 # pyre-ignore-all-errors[2]: Allow `Any` in type annotations
 import os
 from contextlib import contextmanager
-from typing import Any, Generator
+from typing import Any, Generator, Optional, Set
 
 # This file contains various non-user facing constants used throughout the
 # project, and utilities for overriding the constants for testing and debugging
@@ -26,6 +26,12 @@ _DEFAULT_MAX_CHUNK_SIZE_BYTES: int = 512 * 1024 * 1024
 _DEFAULT_MAX_SHARD_SIZE_BYTES: int = 512 * 1024 * 1024
 _DEFAULT_SLAB_SIZE_THRESHOLD_BYTES: int = 128 * 1024 * 1024
 _DISABLE_BATCHING_ENV_VAR = "TORCHSNAPSHOT_DISABLE_BATCHING"
+_PINNED_BUFFER_POOL_SIZE_ENV_VAR = (
+    "TORCHSNAPSHOT_PINNED_BUFFER_POOL_SIZE_BYTES_OVERRIDE"
+)
+
+_DEFAULT_PINNED_BUFFER_POOL_SIZE_BYTES: int = 1024 * 1024 * 1024
+_SNAPSHOT_CPUSET_ENV_VAR = "TORCHSNAPSHOT_SNAPSHOT_CPUSET"
 
 
 def get_max_chunk_size_bytes() -> int:
@@ -55,6 +61,33 @@ def is_batching_disabled() -> int:
     return False
 
 
+def get_pinned_buffer_pool_size_bytes() -> int:
+    override = os.environ.get(_PINNED_BUFFER_POOL_SIZE_ENV_VAR)
+    if override is not None:
+        return int(override)
+    return _DEFAULT_PINNED_BUFFER_POOL_SIZE_BYTES
+
+
+def get_snapshot_cpuset() -> Optional[Set[int]]:
+    # The value follows the cpuset list format (e.g. "0-3,8,10-11")
+    override = os.environ.get(_SNAPSHOT_CPUSET_ENV_VAR)
+    if override is None:
+        return None
+    cpus = set()
+    try:
+        for part in override.split(","):
+            if "-" in part:
+                first, last = part.split("-")
+                cpus.update(range(int(first), int(last) + 1))
+            else:
+                cpus.add(int(part))
+    except ValueError:
+        raise ValueError(
+            f"Invalid cpuset for {_SNAPSHOT_CPUSET_ENV_VAR}: {override!r}."
+        ) from None
+    return cpus
+
+
 @contextmanager
 def _override_env_var(env_var: str, value: Any) -> Generator[None, None, None]:
     prev = os.environ.get(env_var)
@@ -94,3 +127,19 @@ def override_slab_size_threshold_bytes(
 ) -> Generator[None, None, None]:
     with _override_env_var(_MAX_SHARD_SIZE_ENV_VAR, max_shard_size_bytes):
         yield
+
+
+@contextmanager
+def override_pinned_buffer_pool_size_bytes(
+    pinned_buffer_pool_size_bytes: int,
+) -> Generator[None, None, None]:
+    with _override_env_var(
+        _PINNED_BUFFER_POOL_SIZE_ENV_VAR, pinned_buffer_pool_size_bytes
+    ):
+        yield
+
+
+@contextmanager
+def override_snapshot_cpuset(cpuset: str) -> Generator[None, None, None]:
+    with _override_env_var(_SNAPSHOT_CPUSET_ENV_VAR, cpuset):
+        yield
@@ -6,7 +6,7 @@
 # LICENSE file in the root directory of this source tree.
 
 
-import copy
+import pickle
 from collections import defaultdict
 from typing import Dict, List, Tuple
 
@@ -91,7 +91,10 @@ def _get_rank_to_manifest(metadata: SnapshotMetadata) -> List[Dict[str, Entry]]:
         rnk = int(tokens.pop(0))
         logical_path = "/".join(tokens)
         rank_to_manifest[rnk][logical_path] = entry
-    return copy.deepcopy(rank_to_manifest)
+    # Round-tripping through pickle is much faster than copy.deepcopy()
+    return pickle.loads(
+        pickle.dumps(rank_to_manifest, protocol=pickle.HIGHEST_PROTOCOL)
+    )
 
 
 def _get_merged_sharded_tensor_entries(
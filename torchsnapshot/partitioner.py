@@ -6,14 +6,17 @@
 # LICENSE file in the root directory of this source tree.
 
 import copy
+import heapq
 import os
+import pickle
 from collections import defaultdict
 
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
+from .digest_cache import DigestCache
 from .io_preparer import ObjectBufferStager, TensorBufferStager, TensorIOPreparer
 
 from .io_types import WriteReq
@@ -28,6 +31,10 @@ class _WriteLoad:
     size: int
 
 
+# Maps the per-rank partitioning inputs to the partition result
+_partition_result_cache: DigestCache[List[List[_WriteLoad]]] = DigestCache(max_size=8)
+
+
 def _is_subpartitionable(
     logical_path: str,
     rank_to_entries: List[Dict[str, Entry]],
@@ -46,7 +53,10 @@ def _partition_write_loads(
     world_size: int,
 ) -> List[List[_WriteLoad]]:
     partition_result: List[List[_WriteLoad]] = [[] for _ in range(world_size)]
-    partitionables = set()
+    # Units of partitioning. A unit is either a whole logical path (with the
+    # write load being None) or a single write load of a logical path.
+    units: List[Tuple[str, Optional[_WriteLoad]]] = []
+    unit_sizes: List[int] = []
 
     for logical_path in rank_to_entries[0].keys():
         # A logical path may associate with multiple write requests spread. We
@@ -59,22 +69,35 @@ def _partition_write_loads(
         ):
             # If the logical path is not subpartitionable, all associated write
             # requests need to be fulfilled by a single rank.
-            size = sum(wl.size for wl in rank_to_write_loads[0][logical_path])
-            chosen_rank = np.argmin(rank_to_size)
-            partition_result[chosen_rank].extend(
-                rank_to_write_loads[chosen_rank][logical_path]
+            units.append((logical_path, None))
+            unit_sizes.append(
+                sum(wl.size for wl in rank_to_write_loads[0][logical_path])
             )
-            rank_to_size[chosen_rank] += size
         else:
             # If the logical path is subpartitionable, all associated write
             # loads are considered a unit of partitioning.
-            partitionables.update(rank_to_write_loads[0][logical_path])
-
-    # Greedily assign replicated chunks among ranks, based on current sizes of ranks
-    for partitionable in partitionables:
-        chosen_rank = np.argmin(rank_to_size)
-        partition_result[chosen_rank].append(partitionable)
-        rank_to_size[chosen_rank] += partitionable.size
+            for wl in rank_to_write_loads[0][logical_path]:
+                units.append((logical_path, wl))
+                unit_sizes.append(wl.size)
+
+    # Assign the units among ranks with the longest-processing-time-first
+    # heuristic, based on current sizes of ranks: the largest remaining unit
+    # is always assigned to the least loaded rank. The sizes are laid out in
+    # an array so that the units can be ordered without going through Python
+    # sort keys.
+    sizes = np.array(unit_sizes, dtype=np.int64)
+    rank_loads = [(size, rank) for rank, size in enumerate(rank_to_size)]
+    heapq.heapify(rank_loads)
+    for idx in np.argsort(-sizes, kind="stable"):
+        load, chosen_rank = rank_loads[0]
+        logical_path, write_load = units[idx]
+        if write_load is None:
+            partition_result[chosen_rank].extend(
+                rank_to_write_loads[chosen_rank][logical_path]
+            )
+        else:
+            partition_result[chosen_rank].append(write_load)
+        heapq.heapreplace(rank_loads, (load + int(sizes[idx]), chosen_rank))
 
     return partition_result
 
@@ -90,6 +113,34 @@ def _estimate_write_req_storage_size(write_req: WriteReq) -> int:
     return size
 
 
+def _gather_and_partition_write_loads(
+    partition_input: Tuple[Dict[str, Entry], Dict[str, List[_WriteLoad]], int],
+    pg: PGWrapper,
+) -> List[List[_WriteLoad]]:
+    # pyre-ignore
+    object_list: List[Tuple[Dict[str, Entry], Dict[str, List[_WriteLoad]], int]] = [
+        None
+    ] * pg.get_world_size()
+    pg.all_gather_object(obj_list=object_list, obj=partition_input)
+    rank_to_entries, rank_to_write_loads, rank_to_size = list(zip(*object_list))
+
+    if pg.get_rank() == 0:
+        # Rank 0 performs the partitioning
+        partition_result = _partition_write_loads(
+            rank_to_entries=rank_to_entries,
+            rank_to_write_loads=rank_to_write_loads,
+            rank_to_size=list(rank_to_size),
+            world_size=pg.get_world_size(),
+        )
+        obj_list = [partition_result]
+    else:
+        # pyre-ignore
+        obj_list: List[List[List[_WriteLoad]]] = [None]
+
+    pg.broadcast_object_list(obj_list=obj_list, src=0)
+    return obj_list[0]
+
+
 def _partition_replicated_write_reqs(
     entries: Dict[str, Entry],
     write_reqs: Dict[str, List[WriteReq]],
@@ -119,30 +170,17 @@ def _partition_replicated_write_reqs(
             )
             write_loads[logical_path].append(write_load)
 
-    # pyre-ignore
-    object_list: List[Tuple[Dict[str, Entry], Dict[str, List[_WriteLoad]], int]] = [
-        None
-    ] * pg.get_world_size()
-    pg.all_gather_object(
-        obj_list=object_list, obj=(entries, write_loads, non_replicated_size)
+    # Only gather the inputs if the combination of per-rank inputs hasn't been
+    # partitioned before
+    partition_input = (entries, write_loads, non_replicated_size)
+    cache_key, partition_result, _ = _partition_result_cache.lookup(
+        pg, pickle.dumps(partition_input, protocol=pickle.HIGHEST_PROTOCOL)
     )
-    rank_to_entries, rank_to_write_loads, rank_to_size = list(zip(*object_list))
-
-    if pg.get_rank() == 0:
-        # Rank 0 performs the partitioning
-        partition_result = _partition_write_loads(
-            rank_to_entries=rank_to_entries,
-            rank_to_write_loads=rank_to_write_loads,
-            rank_to_size=list(rank_to_size),
-            world_size=pg.get_world_size(),
+    if partition_result is None:
+        partition_result = _gather_and_partition_write_loads(
+            partition_input=partition_input, pg=pg
         )
-        obj_list = [partition_result]
-    else:
-        # pyre-ignore
-        obj_list: List[List[List[_WriteLoad]]] = [None]
-
-    pg.broadcast_object_list(obj_list=obj_list, src=0)
-    partition_result = obj_list[0]
+        _partition_result_cache.put(pg, cache_key, partition_result)
 
     write_loads = sorted(
         (write_load.logical_path, write_load.write_req_idx)
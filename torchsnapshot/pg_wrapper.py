@@ -7,10 +7,50 @@
 
 # pyre-ignore-all-errors[2]
 
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+import torch
 import torch.distributed as dist
 
+_pg_to_gloo_pg: Dict[dist.ProcessGroup, dist.ProcessGroup] = {}
+
+
+def get_or_create_gloo_pg(
+    pg: Optional[dist.ProcessGroup],
+) -> Optional[dist.ProcessGroup]:
+    """
+    Get or create a gloo process group with the same ranks as the input
+    process group, for issuing snapshot metadata collectives without
+    contending with the training job's NCCL communication.
+
+    NOTE: creating a process group requires the participation of all ranks of
+    the default process group. Thus a gloo process group is only created for
+    the default process group. For other non-gloo process groups, the input
+    process group is returned as is.
+
+    Args:
+        pg: The process group for the processes taking the snapshot.
+
+    Returns:
+        A gloo process group if one can be obtained, otherwise the input
+        process group.
+    """
+    if not dist.is_initialized():
+        return pg
+    if pg is None:
+        # pyre-ignore
+        pg = dist.group.WORLD
+    if dist.get_backend(pg) == "gloo":
+        return pg
+    if pg in _pg_to_gloo_pg:
+        return _pg_to_gloo_pg[pg]
+    if pg is not dist.group.WORLD:
+        return pg
+    gloo_pg = dist.new_group(backend="gloo")
+    _pg_to_gloo_pg[pg] = gloo_pg
+    return gloo_pg
+
 
 class PGWrapper:
     """
@@ -55,6 +95,123 @@ class PGWrapper:
             return
         dist.all_gather_object(obj_list, obj, group=self.pg)
 
+    def gather_object(
+        self, obj: Any, obj_list: Optional[List[Any]], dst: int = 0
+    ) -> None:
+        if self.pg is None:
+            if obj_list is not None:
+                obj_list[0] = obj
+            return
+        if self.get_rank() != dst:
+            obj_list = None
+        # dist.gather_object() expects the global rank of the destination
+        dst = dist.distributed_c10d._get_global_rank(self.pg, dst)
+        dist.gather_object(obj, obj_list, dst=dst, group=self.pg)
+
+    def all_gather_bytes(self, buf: bytes) -> List[bytes]:
+        # Unlike all_gather_object, the payload is not pickled, which allows
+        # the caller to serialize it in the most efficient way
+        if self.pg is None:
+            return [buf]
+        device = self._get_device()
+        local_size = torch.tensor([len(buf)], dtype=torch.int64, device=device)
+        sizes = [torch.empty_like(local_size) for _ in range(self.get_world_size())]
+        dist.all_gather(sizes, local_size, group=self.pg)
+        sizes = [int(size.item()) for size in sizes]
+
+        max_size = self._pad_size(max(sizes))
+        local_tensor = self._bytes_to_tensor(buf=buf, size=max_size, device=device)
+        tensors = [torch.empty_like(local_tensor) for _ in sizes]
+        dist.all_gather(tensors, local_tensor, group=self.pg)
+        return [
+            self._tensor_to_bytes(tensor=tensor, size=size)
+            for tensor, size in zip(tensors, sizes)
+        ]
+
+    def all_gather_digest(self, digest: bytes) -> List[bytes]:
+        # All ranks must pass digests of the same length. Unlike
+        # all_gather_bytes, this only takes a single collective since the
+        # sizes don't need to be exchanged.
+        if self.pg is None:
+            return [digest]
+        device = self._get_device()
+        local_tensor = self._bytes_to_tensor(
+            buf=digest, size=len(digest), device=device
+        )
+        tensors = [torch.empty_like(local_tensor) for _ in range(self.get_world_size())]
+        dist.all_gather(tensors, local_tensor, group=self.pg)
+        return [
+            self._tensor_to_bytes(tensor=tensor, size=len(digest)) for tensor in tensors
+        ]
+
+    def gather_bytes(self, buf: bytes, dst: int = 0) -> Optional[List[bytes]]:
+        # Only the dst rank receives (and can deserialize) the payloads. Other
+        # ranks get None.
+        if self.pg is None:
+            return [buf]
+        device = self._get_device()
+        local_size = torch.tensor([len(buf)], dtype=torch.int64, device=device)
+        sizes = [torch.empty_like(local_size) for _ in range(self.get_world_size())]
+        dist.all_gather(sizes, local_size, group=self.pg)
+        sizes = [int(size.item()) for size in sizes]
+
+        max_size = self._pad_size(max(sizes))
+        local_tensor = self._bytes_to_tensor(buf=buf, size=max_size, device=device)
+        is_dst = self.get_rank() == dst
+        tensors = [torch.empty_like(local_tensor) for _ in sizes] if is_dst else None
+        global_dst = dist.distributed_c10d._get_global_rank(self.pg, dst)
+        dist.gather(local_tensor, tensors, dst=global_dst, group=self.pg)
+        if tensors is None:
+            return None
+        return [
+            self._tensor_to_bytes(tensor=tensor, size=size)
+            for tensor, size in zip(tensors, sizes)
+        ]
+
+    def broadcast_bytes(self, buf: Optional[bytes], src: int = 0) -> bytes:
+        if self.pg is None:
+            if buf is None:
+                raise RuntimeError("The src rank's buf for broadcast_bytes is None.")
+            return buf
+        device = self._get_device()
+        is_src = self.get_rank() == src
+        if is_src and buf is None:
+            raise RuntimeError("The src rank's buf for broadcast_bytes is None.")
+        global_src = dist.distributed_c10d._get_global_rank(self.pg, src)
+
+        size = torch.tensor(
+            [len(buf) if is_src else 0], dtype=torch.int64, device=device
+        )
+        dist.broadcast(size, src=global_src, group=self.pg)
+        sz = int(size.item())
+
+        if is_src:
+            tensor = self._bytes_to_tensor(buf=buf, size=sz, device=device)
+        else:
+            tensor = torch.empty(sz, dtype=torch.uint8, device=device)
+        dist.broadcast(tensor, src=global_src, group=self.pg)
+        return self._tensor_to_bytes(tensor=tensor, size=sz)
+
+    def _get_device(self) -> torch.device:
+        if dist.get_backend(self.pg) == "nccl":
+            return torch.device("cuda", torch.cuda.current_device())
+        return torch.device("cpu")
+
+    @staticmethod
+    def _pad_size(size: int) -> int:
+        # Pad to a multiple of 8 bytes
+        return (size + 7) // 8 * 8
+
+    @staticmethod
+    def _bytes_to_tensor(buf: bytes, size: int, device: torch.device) -> torch.Tensor:
+        tensor = torch.zeros(size, dtype=torch.uint8)
+        tensor.numpy()[: len(buf)] = np.frombuffer(buf, dtype=np.uint8)
+        return tensor.to(device)
+
+    @staticmethod
+    def _tensor_to_bytes(tensor: torch.Tensor, size: int) -> bytes:
+        return tensor[:size].cpu().numpy().tobytes()
+
     def scatter_object_list(
         self,
         output_list: List[Any],
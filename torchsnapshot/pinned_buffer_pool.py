@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Set
+
+import torch
+
+from .knobs import get_pinned_buffer_pool_size_bytes
+
+
+class PinnedBufferPool:
+    """
+    A pool of page-locked host buffers for DtoH copies.
+
+    Allocating and freeing page-locked memory is expensive, and a fresh host
+    buffer per snapshot thrashes the allocator under repeated snapshots. The
+    pool hands out buffers whose sizes are rounded up to the next power of
+    two, and keeps the released buffers around for reuse by later snapshots.
+
+    The total amount of memory allocated by the pool is capped. When a request
+    can't be satisfied within the cap, the free buffers of the least recently
+    used sizes are evicted to make room. If that's not enough, :meth:`acquire`
+    returns None and the caller is expected to fall back to pageable memory.
+    """
+
+    def __init__(self, capacity_bytes: int) -> None:
+        self.capacity_bytes = capacity_bytes
+        self._allocated_bytes = 0
+        # Ordered from the least recently used bucket to the most recently
+        # used one
+        self._free_buffers: "OrderedDict[int, List[torch.Tensor]]" = OrderedDict()
+        # The buckets acquired from since the last release_idle_buffers()
+        self._active_buckets: Set[int] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def allocated_bytes(self) -> int:
+        """
+        The amount of memory allocated by the pool, including the buffers that
+        are currently acquired.
+        """
+        return self._allocated_bytes
+
+    @staticmethod
+    def _bucket_size_bytes(nbytes: int) -> int:
+        return 1 << max(nbytes - 1, 0).bit_length()
+
+    def acquire(self, nbytes: int) -> Optional[torch.Tensor]:
+        """
+        Acquire a uint8 buffer of at least ``nbytes`` bytes.
+
+        Args:
+            nbytes: The minimum size of the buffer.
+
+        Returns:
+            A 1-D uint8 tensor, or None if the pool is exhausted.
+        """
+        bucket_sz_bytes = self._bucket_size_bytes(nbytes)
+        with self._lock:
+            free_buffers = self._free_buffers.get(bucket_sz_bytes)
+            if free_buffers is not None:
+                buf = free_buffers.pop()
+                if len(free_buffers) == 0:
+                    del self._free_buffers[bucket_sz_bytes]
+                self._active_buckets.add(bucket_sz_bytes)
+                return buf
+            if bucket_sz_bytes > self.capacity_bytes:
+                return None
+            self._evict(self.capacity_bytes - bucket_sz_bytes)
+            if self._allocated_bytes + bucket_sz_bytes > self.capacity_bytes:
+                return None
+            self._allocated_bytes += bucket_sz_bytes
+            self._active_buckets.add(bucket_sz_bytes)
+        return torch.empty(
+            bucket_sz_bytes,
+            dtype=torch.uint8,
+            pin_memory=torch.cuda.is_available(),
+        )
+
+    def release(self, buf: torch.Tensor) -> None:
+        """
+        Return a buffer previously obtained via :meth:`acquire` to the pool.
+
+        Args:
+            buf: The buffer to return.
+        """
+        bucket_sz_bytes = buf.nelement()
+        with self._lock:
+            self._free_buffers.setdefault(bucket_sz_bytes, []).append(buf)
+            self._free_buffers.move_to_end(bucket_sz_bytes)
+
+    def release_idle_buffers(self) -> None:
+        """
+        Free the buffers of the sizes that haven't been acquired since the
+        last call.
+
+        This is called after each snapshot, so that repeated snapshots of the
+        same program state keep reusing the pooled buffers, while the buffers
+        of sizes that are no longer needed are freed.
+        """
+        with self._lock:
+            for bucket_sz_bytes in list(self._free_buffers.keys()):
+                if bucket_sz_bytes not in self._active_buckets:
+                    free_buffers = self._free_buffers.pop(bucket_sz_bytes)
+                    self._allocated_bytes -= bucket_sz_bytes * len(free_buffers)
+            self._active_buckets.clear()
+
+    def clear(self) -> None:
+        """
+        Free the buffers that are currently held by the pool.
+
+        Buffers that are acquired at the time of the call are unaffected, and
+        are retained by the pool once released.
+        """
+        with self._lock:
+            self._evict(0)
+
+    def _evict(self, target_bytes: int) -> None:
+        # Free buffers, starting from the least recently used bucket, until the
+        # allocated memory is within target_bytes or no free buffer is left.
+        # The caller must hold the lock.
+        while self._allocated_bytes > target_bytes and len(self._free_buffers) != 0:
+            bucket_sz_bytes, free_buffers = next(iter(self._free_buffers.items()))
+            free_buffers.pop()
+            if len(free_buffers) == 0:
+                del self._free_buffers[bucket_sz_bytes]
+            self._allocated_bytes -= bucket_sz_bytes
+
+
+_pinned_buffer_pool: Optional[PinnedBufferPool] = None
+_pinned_buffer_pool_lock = threading.Lock()
+
+
+def get_pinned_buffer_pool() -> PinnedBufferPool:
+    """
+    Get the process-wide pinned buffer pool, creating it if necessary.
+
+    Returns:
+        The process-wide :class:`PinnedBufferPool`.
+    """
+    global _pinned_buffer_pool
+    with _pinned_buffer_pool_lock:
+        if _pinned_buffer_pool is None:
+            _pinned_buffer_pool = PinnedBufferPool(
+                capacity_bytes=get_pinned_buffer_pool_size_bytes()
+            )
+        return _pinned_buffer_pool
@@ -12,14 +12,15 @@ import math
 import os
 import socket
 import time
-from collections import defaultdict
 from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import cast, ClassVar, List, Optional, Set
 
 import psutil
+import torch
 
 from .io_types import BufferType, ReadIO, ReadReq, StoragePlugin, WriteIO, WriteReq
 from .pg_wrapper import PGWrapper
+from .pinned_buffer_pool import get_pinned_buffer_pool
 
 logger: logging.Logger = logging.getLogger(__name__)
 
@@ -31,15 +32,10 @@ _MAX_PER_RANK_IO_CONCURRENCY: int = 16
 
 
 def get_local_world_size(pg: PGWrapper) -> int:
-    hostname = socket.gethostname()
-    obj_list = [None] * pg.get_world_size()
-    pg.all_gather_object(obj_list=obj_list, obj=hostname)
-
-    hostname_world_size = defaultdict(int)
-    for hostname in obj_list:
-        hostname_world_size[hostname] += 1
-
-    return hostname_world_size[hostname]
+    # Exchange the hostnames as UTF-8 bytes to avoid pickling
+    hostname = socket.gethostname().encode("utf-8")
+    hostnames = pg.all_gather_bytes(hostname)
+    return hostnames.count(hostname)
 
 
 def get_process_memory_budget_bytes(pg: PGWrapper) -> int:
@@ -58,8 +54,14 @@ def get_process_memory_budget_bytes(pg: PGWrapper) -> int:
         psutil.virtual_memory().available * _AVAILABLE_MEMORY_MULTIPLIER
     )
     local_world_size = get_local_world_size(pg)
-    memory_budget_bytes = min(
-        available_mem_bytes // local_world_size, _MAX_PER_RANK_MEMORY_BUDGET_BYTES
+    memory_budget_bytes = available_mem_bytes // local_world_size
+    if torch.cuda.is_available():
+        # The pinned buffer pool of the process can grow up to its capacity
+        # while staging, and its memory can't be reclaimed by the OS
+        pool = get_pinned_buffer_pool()
+        memory_budget_bytes -= pool.capacity_bytes - pool.allocated_bytes
+    memory_budget_bytes = max(
+        min(memory_budget_bytes, _MAX_PER_RANK_MEMORY_BUDGET_BYTES), 0
     )
     logger.info(f"Set process memory budget to {memory_budget_bytes} bytes.")
     return memory_budget_bytes
@@ -74,20 +76,31 @@ class _WritePipeline:
         self.buf_sz_bytes: Optional[int] = None
 
     async def stage_buffer(self, executor: Executor) -> "_WritePipeline":
-        self.buf = await self.write_req.buffer_stager.stage_buffer(executor)
+        try:
+            self.buf = await self.write_req.buffer_stager.stage_buffer(executor)
+        except BaseException:
+            self.release_buffer()
+            raise
         self.buf_sz_bytes = len(self.buf)
         return self
 
     async def write_buffer(self) -> "_WritePipeline":
         if self.buf is None:
             raise AssertionError("self.buf can not be None.")
-        write_io = WriteIO(path=self.write_req.path, buf=self.buf)
-        await self.storage.write(write_io=write_io)
+        try:
+            await self.write_req.buffer_stager.synchronize()
+            write_io = WriteIO(path=self.write_req.path, buf=self.buf)
+            await self.storage.write(write_io=write_io)
+
+            # Reclaim buffer memory
+            del write_io
+        finally:
+            self.release_buffer()
+        return self
 
-        # Reclaim buffer memory
-        del write_io
+    def release_buffer(self) -> None:
         self.buf = None
-        return self
+        self.write_req.buffer_stager.release_buffer()
 
 
 _LOG_LINE_LIMIT = 8
@@ -192,6 +205,16 @@ class PendingIOWork:
         )
 
     async def complete(self) -> None:
+        try:
+            await self._complete()
+        except BaseException:
+            # Release the staged buffers that won't be written
+            for p in self.ready_for_io:
+                p.release_buffer()
+            self.ready_for_io.clear()
+            raise
+
+    async def _complete(self) -> None:
         while len(self.ready_for_io) + len(self.io_tasks) != 0:
             done, _ = await asyncio.wait(
                 self.io_tasks, return_when=asyncio.FIRST_COMPLETED
@@ -294,39 +317,47 @@ async def execute_write_reqs(
         executor=executor,
     )
 
-    while len(ready_for_staging) + len(staging_tasks) != 0:
-        done, _ = await asyncio.wait(
-            staging_tasks | io_tasks, return_when=asyncio.FIRST_COMPLETED
-        )
-        for d in done:
-            if d in staging_tasks:
-                staging_tasks.remove(d)
-                write_pipeline: _WritePipeline = d.result()
-                ready_for_io.add(write_pipeline)
-                # Update memory budget: the staging cost can be different from
-                # the buffer size. For example, when serializing a tensor with
-                # torch.save, the staging cost is 2x the buffer size.
-                memory_budget_bytes += write_pipeline.staging_cost_bytes
-                memory_budget_bytes -= cast(int, write_pipeline.buf_sz_bytes)
-                if len(staging_tasks) % logging_freq == 0:
-                    write_reporter.report(memory_budget_bytes=memory_budget_bytes)
-
-            elif d in io_tasks:
-                io_tasks.remove(d)
-                write_pipeline: _WritePipeline = d.result()
-                memory_budget_bytes += cast(int, write_pipeline.buf_sz_bytes)
-                write_reporter.bytes_written += cast(int, write_pipeline.buf_sz_bytes)
-            else:
-                raise AssertionError(
-                    "The completed task must be in either staging_tasks or io_tasks."
-                )
-            dispatch_io(ready_for_io=ready_for_io, io_tasks=io_tasks)
-            memory_budget_bytes = dispatch_staging(
-                ready_for_staging=ready_for_staging,
-                staging_tasks=staging_tasks,
-                memory_budget_bytes=memory_budget_bytes,
-                executor=executor,
+    try:
+        while len(ready_for_staging) + len(staging_tasks) != 0:
+            done, _ = await asyncio.wait(
+                staging_tasks | io_tasks, return_when=asyncio.FIRST_COMPLETED
             )
+            for d in done:
+                if d in staging_tasks:
+                    staging_tasks.remove(d)
+                    write_pipeline: _WritePipeline = d.result()
+                    ready_for_io.add(write_pipeline)
+                    # Update memory budget: the staging cost can be different from
+                    # the buffer size. For example, when serializing a tensor with
+                    # torch.save, the staging cost is 2x the buffer size.
+                    memory_budget_bytes += write_pipeline.staging_cost_bytes
+                    memory_budget_bytes -= cast(int, write_pipeline.buf_sz_bytes)
+                    if len(staging_tasks) % logging_freq == 0:
+                        write_reporter.report(memory_budget_bytes=memory_budget_bytes)
+
+                elif d in io_tasks:
+                    io_tasks.remove(d)
+                    write_pipeline: _WritePipeline = d.result()
+                    memory_budget_bytes += cast(int, write_pipeline.buf_sz_bytes)
+                    write_reporter.bytes_written += cast(
+                        int, write_pipeline.buf_sz_bytes
+                    )
+                else:
+                    raise AssertionError(
+                        "The completed task must be in either staging_tasks or io_tasks."
+                    )
+                dispatch_io(ready_for_io=ready_for_io, io_tasks=io_tasks)
+                memory_budget_bytes = dispatch_staging(
+                    ready_for_staging=ready_for_staging,
+                    staging_tasks=staging_tasks,
+                    memory_budget_bytes=memory_budget_bytes,
+                    executor=executor,
+                )
+    except BaseException:
+        # Release the staged buffers that won't be written
+        for p in ready_for_io:
+            p.release_buffer()
+        raise
     write_reporter.report_staging_done()
     executor.shutdown()
     return PendingIOWork(
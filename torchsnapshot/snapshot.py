@@ -7,20 +7,36 @@
 
 import asyncio
 
-import copy
 import fnmatch
 import functools
+import hashlib
 import itertools
 import logging
 import os
+import pickle
+import re
 import sys
 import traceback
+import weakref
 
 from collections import defaultdict
 from datetime import timedelta
-from threading import Thread
-from typing import Any, Callable, cast, Dict, List, Optional, Set, Tuple, TypeVar
+from threading import Event, get_native_id, Thread
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
+import psutil
 import torch
 import torch.distributed as dist
 from torch.distributed._shard.sharded_tensor import ShardedTensor
@@ -28,12 +44,13 @@ from torch.nn.parallel import DistributedDataParallel as DDP
 
 from .batcher import batch_read_requests, batch_write_requests
 
+from .digest_cache import DigestCache
 from .dist_store import get_or_create_store, LinearBarrier
 
-from .flatten import flatten, inflate
+from .flatten import _encode, flatten, inflate
 from .io_preparer import prepare_read, prepare_write
-from .io_types import ReadIO, ReadReq, StoragePlugin, WriteIO, WriteReq
-from .knobs import is_batching_disabled
+from .io_types import Future, ReadIO, ReadReq, StoragePlugin, WriteIO, WriteReq
+from .knobs import get_snapshot_cpuset, is_batching_disabled
 
 from .manifest import (
     Entry,
@@ -44,7 +61,8 @@ from .manifest import (
 )
 from .manifest_ops import get_manifest_for_rank, handle_sharded_tensor_elasticity
 from .partitioner import consolidate_replicated_entries, partition_write_reqs
-from .pg_wrapper import PGWrapper
+from .pg_wrapper import get_or_create_gloo_pg, PGWrapper
+from .pinned_buffer_pool import get_pinned_buffer_pool
 from .rng_state import RNGState
 from .scheduler import (
     _MAX_PER_RANK_MEMORY_BUDGET_BYTES,
@@ -62,6 +80,40 @@ logger: logging.Logger = logging.getLogger(__name__)
 SNAPSHOT_METADATA_FNAME = ".snapshot_metadata"
 T = TypeVar("T")
 
+_COMMIT_THREAD_NICENESS = 10
+# The lowest priority within the best-effort class. The idle class is
+# avoided since it can starve the commit under sustained disk contention.
+_COMMIT_THREAD_IOPRIO = 7
+
+# DDP's set of parameters is fixed at construction, so their names only need to
+# be collected once per DDP instance. Buffers can still be registered after
+# the module is wrapped, so their names are not cached.
+_ddp_param_names: "weakref.WeakKeyDictionary[DDP, Tuple[str, ...]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _drop_tracebacks(exc: BaseException) -> None:
+    # Drop the tracebacks of the exception and of the exceptions chained to it
+    seen: Set[int] = set()
+    pending: List[BaseException] = [exc]
+    while len(pending) != 0:
+        e = pending.pop()
+        if id(e) in seen:
+            continue
+        seen.add(id(e))
+        e.__traceback__ = None
+        pending.extend(c for c in (e.__cause__, e.__context__) if c is not None)
+
+
+def _close_event_loop_and_storage(
+    event_loop: asyncio.AbstractEventLoop, storage: StoragePlugin
+) -> None:
+    try:
+        storage.sync_close(event_loop=event_loop)
+    finally:
+        event_loop.close()
+
 
 class Snapshot:
     """
@@ -143,6 +195,20 @@ class Snapshot:
         the per-rank values are explicitly coerced to replicated on load.
     """
 
+    _commit_barrier_seqs: Dict[
+        Tuple[Optional[dist.ProcessGroup], str], int
+    ] = defaultdict(int)
+
+    # Maps the per-rank candidate replicated paths to the resolved replicated
+    # paths
+    _replicated_entries_cache: DigestCache[FrozenSet[str]] = DigestCache(max_size=8)
+
+    # Maps the per-rank (replicated, app state keys) to the coalesced
+    # replicated patterns and app state keys
+    _replicated_plan_cache: DigestCache[Tuple[FrozenSet[str], List[str]]] = DigestCache(
+        max_size=8
+    )
+
     def __init__(
         self,
         path: str,
@@ -165,6 +231,13 @@ class Snapshot:
         self.pg: Optional[dist.ProcessGroup] = pg
         self._metadata: Optional[SnapshotMetadata] = None
         self._storage_options = storage_options
+        self._serialized_manifest: Optional[bytes] = None
+        # The event loop and the storage plugin are lazily created and reused
+        # across .restore(), .read_object() and metadata reads. They are
+        # released via .close(), or when the snapshot is garbage collected.
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._storage: Optional[StoragePlugin] = None
+        self._finalizer: Optional[weakref.finalize] = None
 
     @classmethod
     def take(
@@ -201,42 +274,53 @@ class Snapshot:
         cls._validate_app_state(app_state)
 
         event_loop = asyncio.new_event_loop()
-        pg_wrapper = PGWrapper(pg=pg)
-
-        path, coalesced_replicated = cls._coalesce_path_and_replicated(
-            path=path,
-            pg_wrapper=pg_wrapper,
-            app_state=app_state,
-            replicated=replicated or [],
-        )
-        storage = url_to_storage_plugin_in_event_loop(
-            url_path=path, event_loop=event_loop, storage_options=storage_options
-        )
-        pending_io_work, metadata = cls._take_impl(
-            path=path,
-            app_state=app_state,
-            replicated=coalesced_replicated,
-            pg_wrapper=PGWrapper(pg),
-            storage=storage,
-            event_loop=event_loop,
-            is_async_snapshot=False,
-            _custom_tensor_prepare_func=_custom_tensor_prepare_func,
-        )
-        pending_io_work.sync_complete(event_loop=event_loop)
-
-        # IMPORTANT: commit snapshot metadata only after all ranks complete writing
-        pg_wrapper.barrier()
-        if pg_wrapper.get_rank() == 0:
-            cls._write_snapshot_metadata(
-                snapshot_metadata=metadata,
+        try:
+            # Issue the snapshot metadata collectives over a gloo process group
+            pg_wrapper = PGWrapper(pg=get_or_create_gloo_pg(pg))
+
+            (
+                path,
+                coalesced_replicated,
+                global_keys,
+            ) = cls._coalesce_path_and_replicated(
+                path=path,
+                pg_wrapper=pg_wrapper,
+                app_state=app_state,
+                replicated=replicated or [],
+            )
+            storage = url_to_storage_plugin_in_event_loop(
+                url_path=path, event_loop=event_loop, storage_options=storage_options
+            )
+            pending_io_work, metadata = cls._take_impl(
+                path=path,
+                app_state=app_state,
+                replicated=coalesced_replicated,
+                global_keys=global_keys,
+                pg_wrapper=pg_wrapper,
                 storage=storage,
                 event_loop=event_loop,
+                is_async_snapshot=False,
+                _custom_tensor_prepare_func=_custom_tensor_prepare_func,
             )
-
-        storage.sync_close(event_loop=event_loop)
-        event_loop.close()
+            event_loop.run_until_complete(
+                cls._commit_snapshot(
+                    pending_io_work=pending_io_work,
+                    metadata=metadata,
+                    storage=storage,
+                    rank=pg_wrapper.get_rank(),
+                    barrier=cls._create_commit_barrier(
+                        path=path, pg_wrapper=pg_wrapper
+                    ),
+                    barrier_timeout=PendingSnapshot.DEFAULT_BARRIER_TIMEOUT,
+                )
+            )
+        finally:
+            event_loop.close()
         snapshot = cls(path=path, pg=pg, storage_options=storage_options)
-        snapshot._metadata = metadata
+        # Only rank 0 has the global manifest. Other ranks lazily read the
+        # committed metadata from storage when needed.
+        if pg_wrapper.get_rank() == 0:
+            snapshot._metadata = metadata
         return snapshot
 
     @classmethod
@@ -282,8 +366,9 @@ class Snapshot:
         cls._validate_app_state(app_state)
 
         event_loop = asyncio.new_event_loop()
-        pg_wrapper = PGWrapper(pg=pg)
-        path, coalesced_replicated = cls._coalesce_path_and_replicated(
+        # Issue the snapshot metadata collectives over a gloo process group
+        pg_wrapper = PGWrapper(pg=get_or_create_gloo_pg(pg))
+        path, coalesced_replicated, global_keys = cls._coalesce_path_and_replicated(
             path=path,
             pg_wrapper=pg_wrapper,
             app_state=app_state,
@@ -297,7 +382,8 @@ class Snapshot:
             path=path,
             app_state=app_state,
             replicated=coalesced_replicated,
-            pg_wrapper=PGWrapper(pg),
+            global_keys=global_keys,
+            pg_wrapper=pg_wrapper,
             storage=storage,
             event_loop=event_loop,
             is_async_snapshot=True,
@@ -307,6 +393,7 @@ class Snapshot:
         return PendingSnapshot(
             path=path,
             pending_io_work=pending_io_work,
+            pg=pg,
             pg_wrapper=pg_wrapper,
             metadata=metadata,
             storage=storage,
@@ -320,6 +407,7 @@ class Snapshot:
         path: str,
         app_state: AppState,
         replicated: Set[str],
+        global_keys: List[str],
         pg_wrapper: PGWrapper,
         storage: StoragePlugin,
         event_loop: asyncio.AbstractEventLoop,
@@ -351,21 +439,19 @@ class Snapshot:
 
         # Different ranks can register different sets of stateful objects,
         # whose .state_dict() methods may invoke collectives. To avoid
-        # potential interleaving of different collectives, we first gather the
-        # global key list, then invoke .state_dict() on stateful objects in
-        # order with synchronization.
-        # TODO: merge this with coalesce path to save an all_gather call
-        global_keys = cls._gather_keys(
-            keys=list(app_state.keys()), pg_wrapper=pg_wrapper
-        )
-
+        # potential interleaving of different collectives, we use the global
+        # key list gathered alongside the path and the replicated patterns,
+        # and invoke .state_dict() on stateful objects in the same order on all
+        # ranks. Since collectives issued on a process group are matched in
+        # program order, a consistent iteration order is sufficient and a
+        # single barrier after the loop suffices to synchronize the ranks.
         for key in global_keys:
             if key in app_state:
                 state_dict = app_state[key].state_dict()
                 mnfst, fltnd = flatten(state_dict, prefix=key)
                 manifest.update(mnfst)
                 flattened.update(fltnd)
-            pg_wrapper.barrier()
+        pg_wrapper.barrier()
 
         # Undo any potential side effects to the RNG state. The rest of this
         # function won't affect the RNG state or execute application code.
@@ -381,11 +467,12 @@ class Snapshot:
         logical_path_to_write_reqs: Dict[str, List[WriteReq]] = {}
         primitive_entries: Dict[str, PrimitiveEntry] = {}
 
+        rank = pg_wrapper.get_rank()
         for logical_path, obj in flattened.items():
             entry, wrs = prepare_write(
-                obj=flattened[logical_path],
+                obj=obj,
                 logical_path=logical_path,
-                rank=pg_wrapper.get_rank(),
+                rank=rank,
                 replicated=logical_path in replicated_paths,
                 is_async_snapshot=is_async_snapshot,
                 _tensor_prepare_func=functools.partial(
@@ -414,9 +501,8 @@ class Snapshot:
                 entries=list(object_entries.values()), write_reqs=write_reqs
             )
 
-        all_entries = dict(**primitive_entries, **object_entries)
-
-        manifest.update(all_entries)
+        manifest.update(primitive_entries)
+        manifest.update(object_entries)
         manifest = cls._gather_manifest(manifest=manifest, pg=pg_wrapper)
 
         memory_budget_bytes = get_process_memory_budget_bytes(pg=pg_wrapper)
@@ -424,7 +510,7 @@ class Snapshot:
             write_reqs=write_reqs,
             storage=storage,
             memory_budget_bytes=memory_budget_bytes,
-            rank=pg_wrapper.get_rank(),
+            rank=rank,
             event_loop=event_loop,
         )
         metadata = SnapshotMetadata(
@@ -445,58 +531,81 @@ class Snapshot:
         torch._C._log_api_usage_once("torchsnapshot.Snapshot.restore")
         self._validate_app_state(app_state)
 
-        event_loop = asyncio.new_event_loop()
-        pg_wrapper = PGWrapper(self.pg)
-        storage = url_to_storage_plugin_in_event_loop(
-            url_path=self.path,
-            event_loop=event_loop,
-            storage_options=self._storage_options,
-        )
+        event_loop, storage = self._get_event_loop_and_storage()
+        # Issue the snapshot metadata collectives over a gloo process group
+        pg_wrapper = PGWrapper(pg=get_or_create_gloo_pg(self.pg))
 
         app_state = app_state.copy()
         rng_state_item = self._pop_rng_state(app_state=app_state)
 
+        # Invoke .state_dict() and .load_state_dict() on stateful objects in
+        # the same order on all ranks, since they may invoke collectives.
         global_keys = self._gather_keys(
             keys=list(app_state.keys()), pg_wrapper=pg_wrapper
         )
-        for key in global_keys:
-            self._load_stateful(
-                stateful_key=key,
-                stateful=app_state.get(key),
-                storage=storage,
-                pg=pg_wrapper,
-                event_loop=event_loop,
-            )
-            pg_wrapper.barrier()
+        self._load_statefuls(
+            statefuls={key: app_state[key] for key in global_keys if key in app_state},
+            storage=storage,
+            pg=pg_wrapper,
+            event_loop=event_loop,
+        )
+        pg_wrapper.barrier()
 
         # Restore the RNG state last to avoid potential side effects.
         if rng_state_item is not None:
             key, stateful = rng_state_item
-            self._load_stateful(
-                stateful_key=key,
-                stateful=stateful,
+            self._load_statefuls(
+                statefuls={key: stateful},
                 storage=storage,
                 pg=pg_wrapper,
                 event_loop=event_loop,
             )
-        storage.sync_close(event_loop=event_loop)
-        event_loop.close()
 
     @property
     def metadata(self) -> SnapshotMetadata:
         if self._metadata is None:
+            event_loop, storage = self._get_event_loop_and_storage()
+            self._metadata = event_loop.run_until_complete(
+                self._read_snapshot_metadata(storage=storage)
+            )
+        return cast(SnapshotMetadata, self._metadata)
+
+    def close(self) -> None:
+        """
+        Release the event loop and the storage plugin held by the snapshot.
+
+        The snapshot can still be used after being closed, in which case the
+        resources are created again.
+        """
+        if self._finalizer is None:
+            return
+        finalizer = self._finalizer
+        self._event_loop = None
+        self._storage = None
+        self._finalizer = None
+        finalizer()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _get_event_loop_and_storage(
+        self,
+    ) -> Tuple[asyncio.AbstractEventLoop, StoragePlugin]:
+        if self._event_loop is None:
             event_loop = asyncio.new_event_loop()
-            storage = url_to_storage_plugin_in_event_loop(
+            self._storage = url_to_storage_plugin_in_event_loop(
                 url_path=self.path,
                 event_loop=event_loop,
                 storage_options=self._storage_options,
             )
-            self._metadata = self._read_snapshot_metadata(
-                storage=storage, event_loop=event_loop
+            self._event_loop = event_loop
+            self._finalizer = weakref.finalize(
+                self, _close_event_loop_and_storage, event_loop, self._storage
             )
-            storage.sync_close(event_loop=event_loop)
-            event_loop.close()
-        return cast(SnapshotMetadata, self._metadata)
+        return self._event_loop, cast(StoragePlugin, self._storage)
 
     def read_object(
         self,
@@ -558,13 +667,6 @@ class Snapshot:
                 "Its state won't be changed after load. The loaded object will be returned."
             )
 
-        event_loop = asyncio.new_event_loop()
-        pg_wrapper = PGWrapper(self.pg)
-        storage = url_to_storage_plugin_in_event_loop(
-            url_path=self.path,
-            event_loop=event_loop,
-            storage_options=self._storage_options,
-        )
         entry = merged_sd_entries.get(unranked_path) or manifest[unranked_path]
         if isinstance(entry, PrimitiveEntry):
             return cast(T, entry.get_value())
@@ -581,6 +683,8 @@ class Snapshot:
         if not is_batching_disabled():
             read_reqs = batch_read_requests(read_reqs=read_reqs)
 
+        event_loop, storage = self._get_event_loop_and_storage()
+        pg_wrapper = PGWrapper(self.pg)
         sync_execute_read_reqs(
             read_reqs=read_reqs,
             storage=storage,
@@ -589,8 +693,6 @@ class Snapshot:
             rank=pg_wrapper.get_rank(),
             event_loop=event_loop,
         )
-        storage.sync_close(event_loop=event_loop)
-        event_loop.close()
         return fut.obj
 
     def get_manifest(self) -> Dict[str, Entry]:
@@ -600,41 +702,67 @@ class Snapshot:
         Returns:
             The snapshot's manifest.
         """
-        return copy.deepcopy(self.metadata.manifest)
+        # Round-tripping through pickle is much faster than copy.deepcopy()
+        # for a large number of entries. The serialized manifest is cached so
+        # that repeated calls only pay for the deserialization.
+        if self._serialized_manifest is None:
+            self._serialized_manifest = pickle.dumps(
+                self.metadata.manifest, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        return pickle.loads(self._serialized_manifest)
 
-    @staticmethod
+    @classmethod
     def _calculate_replicated_entries(
-        flattened: Dict[str, Any], replicated: Set[str], pg: PGWrapper
+        cls, flattened: Dict[str, Any], replicated: Set[str], pg: PGWrapper
     ) -> Set[str]:
         rank = pg.get_rank()
         world_size = pg.get_world_size()
         replicated_paths = []
-        for path, val in flattened.items():
-            if any(fnmatch.fnmatch(path, p) for p in replicated) and not isinstance(
-                val, ShardedTensor
-            ):
-                replicated_paths.append(path)
-        # pyre-ignore
-        obj_list: List[List[str]] = [None] * world_size
-        pg.all_gather_object(obj_list, replicated_paths)
-
-        if rank == 0:
+        if len(replicated) != 0:
+            # Match all patterns with a single compiled regex
+            pattern = re.compile(
+                "|".join(f"(?:{fnmatch.translate(p)})" for p in replicated)
+            )
+            replicated_paths = [
+                path
+                for path, val in flattened.items()
+                if pattern.match(path) and not isinstance(val, ShardedTensor)
+            ]
+
+        if world_size == 1:
+            return set(replicated_paths)
+
+        # Only gather the full path lists if the combination of per-rank
+        # candidate paths hasn't been resolved before
+        cache_key, cached_paths, _ = cls._replicated_entries_cache.lookup(
+            pg, "\x00".join(replicated_paths).encode()
+        )
+        if cached_paths is not None:
+            return set(cached_paths)
+
+        # Only rank 0 needs the per-rank paths to compute the result
+        bufs = pg.gather_bytes(
+            pickle.dumps(replicated_paths, protocol=pickle.HIGHEST_PROTOCOL), dst=0
+        )
+
+        if bufs is not None:
             # A path is only treated as replicated if:
             # (1) The path matches one of the patterns specified in `replicated`
             # (2) The path exists on all ranks
             # (3) The value is not sharded
             path_count = defaultdict(int)
-            for paths in obj_list:
+            for paths in map(pickle.loads, bufs):
                 for path in paths:
                     path_count[path] += 1
             replicated_paths = list(
                 filter(lambda p: path_count[p] == world_size, replicated_paths)
             )
-            replicated_paths_list = [replicated_paths]
+            buf = pickle.dumps(replicated_paths, protocol=pickle.HIGHEST_PROTOCOL)
         else:
-            replicated_paths_list = [[]]
-        pg.broadcast_object_list(replicated_paths_list, src=0)
-        replicated_paths = replicated_paths_list[0]
+            buf = None
+        replicated_paths = pickle.loads(pg.broadcast_bytes(buf, src=0))
+
+        cls._replicated_entries_cache.put(pg, cache_key, frozenset(replicated_paths))
         return set(replicated_paths)
 
     @staticmethod
@@ -647,67 +775,78 @@ class Snapshot:
                     f"Expected Stateful in app_state for key {key}, got {value_type}."
                 )
 
-    def _load_stateful(  # noqa
+    def _load_statefuls(  # noqa
         self,
-        stateful_key: str,
-        stateful: Optional[Stateful],
+        statefuls: Dict[str, Stateful],
         storage: StoragePlugin,
         pg: PGWrapper,
         event_loop: asyncio.AbstractEventLoop,
     ) -> None:
-        if stateful is None:
+        if len(statefuls) == 0:
             return
 
-        manifest, merged_sd_entries = get_manifest_for_rank(
+        rank_manifest, merged_sd_entries = get_manifest_for_rank(
             metadata=self.metadata, rank=pg.get_rank()
         )
+        # Group the entries by the stateful object they belong to
+        stateful_manifests: Dict[str, Manifest] = defaultdict(dict)
+        for logical_path, entry in rank_manifest.items():
+            stateful_manifests[logical_path.split("/", 1)[0]][logical_path] = entry
 
-        # In most cases (e.g. when the stateful is an nn.Module), the stateful
-        # has already allocated memory for its tensors. Materializing the
-        # persisted state dict and invoking .load_state_dict() would result in
-        # a memory footprint that is 2x the size of the stateful. We can reduce
-        # the memory footprint by exploiting the fact that most .state_dict()
-        # implementations return references to the internal tensors. By loading
-        # directly into the already allocated tensors and use them to construct
-        # a state dict for .load_state_dict(), we can eliminate an extra
-        # intermediate copy of the state. Even if the tensors in the state dict
-        # are copies of the internal tensors, this approach would not use more
-        # memory compared to the baseline.
-        _, flattened = flatten(stateful.state_dict(), prefix=stateful_key)
-        flattened = {
-            k: v
-            for k, v in flattened.items()
-            # ShardedTensor became a subclass of torch.Tensor since PyTorch
-            # 1.13. We can drop the check for ShardedTensor once PyTorch 1.12.1
-            # is no longer supported.
-            if isinstance(v, (torch.Tensor, ShardedTensor))
-        }
-
-        handle_sharded_tensor_elasticity(
-            manifest=manifest,
-            merged_sd_entries=merged_sd_entries,
-            tensor_requests=list(flattened.keys()),
-        )
-
-        container_entries = {}
         read_reqs: List[ReadReq] = []
-        futs = {}
-        for logical_path, entry in manifest.items():
-            if is_container_entry(entry):
-                container_entries[logical_path] = entry
-                continue
-
-            rrs, fut = prepare_read(
-                entry=entry,
-                obj_out=flattened.get(logical_path),
+        stateful_futs: Dict[str, Tuple[Manifest, Dict[str, Future[Any]]]] = {}
+        for stateful_key, stateful in statefuls.items():
+            manifest = stateful_manifests[_encode(stateful_key)]
+
+            # In most cases (e.g. when the stateful is an nn.Module), the
+            # stateful has already allocated memory for its tensors.
+            # Materializing the persisted state dict and invoking
+            # .load_state_dict() would result in a memory footprint that is 2x
+            # the size of the stateful. We can reduce the memory footprint by
+            # exploiting the fact that most .state_dict() implementations
+            # return references to the internal tensors. By loading directly
+            # into the already allocated tensors and use them to construct a
+            # state dict for .load_state_dict(), we can eliminate an extra
+            # intermediate copy of the state. Even if the tensors in the state
+            # dict are copies of the internal tensors, this approach would not
+            # use more memory compared to the baseline.
+            _, flattened = flatten(stateful.state_dict(), prefix=stateful_key)
+            flattened = {
+                k: v
+                for k, v in flattened.items()
+                # ShardedTensor became a subclass of torch.Tensor since PyTorch
+                # 1.13. We can drop the check for ShardedTensor once PyTorch
+                # 1.12.1 is no longer supported.
+                if isinstance(v, (torch.Tensor, ShardedTensor))
+            }
+
+            handle_sharded_tensor_elasticity(
+                manifest=manifest,
+                merged_sd_entries=merged_sd_entries,
+                tensor_requests=list(flattened.keys()),
             )
-            read_reqs += rrs
-            futs[logical_path] = fut
 
-            # Free memory in case the items is a copy
-            if logical_path in flattened:
-                del flattened[logical_path]
+            container_entries = {}
+            futs = {}
+            for logical_path, entry in manifest.items():
+                if is_container_entry(entry):
+                    container_entries[logical_path] = entry
+                    continue
+
+                rrs, fut = prepare_read(
+                    entry=entry,
+                    obj_out=flattened.get(logical_path),
+                )
+                read_reqs += rrs
+                futs[logical_path] = fut
+
+                # Free memory in case the items is a copy
+                if logical_path in flattened:
+                    del flattened[logical_path]
+            stateful_futs[stateful_key] = (container_entries, futs)
 
+        # Execute the read requests of all statefuls together so that they can
+        # be batched and pipelined by the scheduler
         if not is_batching_disabled():
             read_reqs = batch_read_requests(read_reqs=read_reqs)
 
@@ -720,32 +859,111 @@ class Snapshot:
             event_loop=event_loop,
         )
 
-        # Build the originally saved state dict and use it to restore the stateful
-        state_dict = inflate(
-            manifest=container_entries,
-            flattened={k: fut.obj for k, fut in futs.items()},
-            prefix=stateful_key,
+        # Build the originally saved state dicts and use them to restore the
+        # statefuls
+        for stateful_key, stateful in statefuls.items():
+            container_entries, futs = stateful_futs[stateful_key]
+            state_dict = inflate(
+                manifest=container_entries,
+                flattened={k: fut.obj for k, fut in futs.items()},
+                prefix=stateful_key,
+            )
+            stateful.load_state_dict(state_dict)
+
+    @classmethod
+    def _create_commit_barrier(
+        cls, path: str, pg_wrapper: PGWrapper
+    ) -> Optional[LinearBarrier]:
+        if pg_wrapper.get_world_size() == 1:
+            return None
+        # The barrier keys must be unique across snapshots, including the ones
+        # taken to the same path. The per-(pg, path) sequence numbers of the
+        # ranks can diverge (e.g. when a rank retries a failed snapshot), so
+        # all ranks use the leader's. The leader's global rank distinguishes
+        # snapshots taken to the same path over different process groups.
+        leader = dist.distributed_c10d._get_global_rank(pg_wrapper.pg, 0)
+        seq_key = (pg_wrapper.pg, path)
+        obj_list = [cls._commit_barrier_seqs[seq_key]]
+        # dist.broadcast_object_list() expects the global rank of the source
+        pg_wrapper.broadcast_object_list(obj_list=obj_list, src=leader)
+        seq = obj_list[0]
+        cls._commit_barrier_seqs[seq_key] = seq + 1
+        return LinearBarrier(
+            prefix=f"torchsnapshot_{path}_{leader}_{seq}",
+            store=get_or_create_store(pg_wrapper=pg_wrapper),
+            rank=pg_wrapper.get_rank(),
+            world_size=pg_wrapper.get_world_size(),
+            leader_rank=0,
         )
-        stateful.load_state_dict(state_dict)
+
+    @classmethod
+    async def _commit_snapshot(
+        cls,
+        pending_io_work: PendingIOWork,
+        metadata: SnapshotMetadata,
+        storage: StoragePlugin,
+        rank: int,
+        barrier: Optional[LinearBarrier],
+        barrier_timeout: timedelta,
+    ) -> None:
+        # WARNING: do not use any collectives in this method
+        #
+        # Use a dist.Store-based barrier for synchronization so that the
+        # snapshot can be committed without communicating over the process
+        # group, which may be concurrently used by the training loop (e.g.
+        # when the snapshot is committed in a background thread). The barrier
+        # also propagates errors, so that no rank commits a snapshot that a
+        # peer failed to write.
+        loop = asyncio.get_running_loop()
+        try:
+            metadata_buf: Optional[asyncio.Future[bytes]] = None
+            if rank == 0:
+                # Serializing the metadata doesn't depend on the outcome of the
+                # storage I/O. Overlap the two.
+                metadata_buf = loop.run_in_executor(
+                    None, cls._serialize_snapshot_metadata, metadata
+                )
+            await pending_io_work.complete()
+
+            # IMPORTANT: commit snapshot metadata only after all ranks complete writing
+            # The barrier blocks on the store, so keep it off the event loop
+            if barrier is not None:
+                await loop.run_in_executor(
+                    None, functools.partial(barrier.arrive, timeout=barrier_timeout)
+                )
+            if metadata_buf is not None:
+                await cls._write_snapshot_metadata(
+                    metadata_buf=await metadata_buf, storage=storage
+                )
+            if barrier is not None:
+                await loop.run_in_executor(
+                    None, functools.partial(barrier.depart, timeout=barrier_timeout)
+                )
+        except Exception as e:
+            if barrier is not None:
+                barrier.report_error(str(e))
+            raise
+        finally:
+            await storage.close()
+            # Free the pooled pinned buffers of the sizes no longer in use
+            get_pinned_buffer_pool().release_idle_buffers()
 
     @staticmethod
-    def _write_snapshot_metadata(
-        snapshot_metadata: SnapshotMetadata,
+    def _serialize_snapshot_metadata(snapshot_metadata: SnapshotMetadata) -> bytes:
+        return snapshot_metadata.to_yaml().encode("utf-8")
+
+    @staticmethod
+    async def _write_snapshot_metadata(
+        metadata_buf: bytes,
         storage: StoragePlugin,
-        event_loop: asyncio.AbstractEventLoop,
     ) -> None:
-        write_io = WriteIO(
-            path=SNAPSHOT_METADATA_FNAME,
-            buf=snapshot_metadata.to_yaml().encode("utf-8"),
-        )
-        storage.sync_write(write_io=write_io, event_loop=event_loop)
+        write_io = WriteIO(path=SNAPSHOT_METADATA_FNAME, buf=metadata_buf)
+        await storage.write(write_io=write_io)
 
     @staticmethod
-    def _read_snapshot_metadata(
-        storage: StoragePlugin, event_loop: asyncio.AbstractEventLoop
-    ) -> SnapshotMetadata:
+    async def _read_snapshot_metadata(storage: StoragePlugin) -> SnapshotMetadata:
         read_io = ReadIO(path=SNAPSHOT_METADATA_FNAME)
-        storage.sync_read(read_io=read_io, event_loop=event_loop)
+        await storage.read(read_io=read_io)
         yaml_str = read_io.buf.getvalue().decode("utf-8")
         return SnapshotMetadata.from_yaml(yaml_str)
 
@@ -756,37 +974,64 @@ class Snapshot:
         pg_wrapper: PGWrapper,
         app_state: AppState,
         replicated: List[str],
-    ) -> Tuple[str, Set[str]]:
-
+    ) -> Tuple[str, Set[str], List[str]]:
         rank = pg_wrapper.get_rank()
 
-        # coalesce path
-        # TODO: use a single all_gather for both path and replicated.
-        # Only emit a single message for path inconsistency.
-        obj_list = [path]
-        pg_wrapper.broadcast_object_list(obj_list, src=0)
-        if obj_list[0] != path:
-            logger.warning(
-                f"Rank {rank} specified a path ({path}) "
-                f"different from rank 0 ({obj_list[0]}). Using path specified by rank 0."
-            )
-
         # TODO: this should be folded into _calculate_replicated_entries
-        # coalesce replicated
         replicated = cls._infer_replicated(replicated, app_state)
-        # pyre-ignore[9]
-        global_replicated: List[List[str]] = [None] * pg_wrapper.get_world_size()
-        pg_wrapper.all_gather_object(global_replicated, replicated)
 
-        coalesced_replicated = cls._coalesce_replicated(
-            global_replicated=global_replicated
+        if pg_wrapper.get_world_size() == 1:
+            return path, set(replicated), sorted(app_state.keys())
+
+        # Exchange the digest of the path along with the cache lookup of the
+        # replicated patterns and app state keys in a single collective. The
+        # path is only broadcast if it differs across ranks, and the full
+        # patterns and keys are only gathered if the combination hasn't been
+        # seen before.
+        local_plan = pickle.dumps(
+            (replicated, sorted(app_state.keys())), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        cache_key, cached_plan, global_path_digests = cls._replicated_plan_cache.lookup(
+            pg_wrapper, local_plan, extra=hashlib.sha1(path.encode()).digest()
         )
-        if set(replicated) != coalesced_replicated:
+
+        # coalesce path
+        inconsistent_ranks = [
+            r for r, d in enumerate(global_path_digests) if d != global_path_digests[0]
+        ]
+        if len(inconsistent_ranks) != 0:
+            path = pg_wrapper.broadcast_bytes(
+                path.encode() if rank == 0 else None, src=0
+            ).decode()
+            if rank == 0:
+                logger.warning(
+                    f"Ranks {inconsistent_ranks} specified paths different from "
+                    f"rank 0 ({path}). Using path specified by rank 0."
+                )
+
+        if cached_plan is None:
+            global_replicated, global_keys = zip(
+                *map(pickle.loads, pg_wrapper.all_gather_bytes(local_plan))
+            )
+            # coalesce replicated
+            coalesced_replicated = cls._coalesce_replicated(
+                global_replicated=list(global_replicated)
+            )
+            # coalesce keys
+            coalesced_keys = sorted(set(itertools.chain.from_iterable(global_keys)))
+            cached_plan = (frozenset(coalesced_replicated), coalesced_keys)
+            cls._replicated_plan_cache.put(pg_wrapper, cache_key, cached_plan)
+        coalesced_replicated, coalesced_keys = cached_plan
+
+        # The coalesced patterns are a subset of every rank's patterns, so
+        # they only differ if some local pattern is missing from them. The
+        # sets for the warning are only built when that's the case.
+        if not coalesced_replicated.issuperset(replicated):
             logger.warning(
-                f"Rank {rank} specified replicated paths: {set(global_replicated[rank])} "
-                f"different from replicated paths verified across all ranks: {set(replicated)}"
+                f"Rank {rank} specified replicated paths: {set(replicated)} "
+                f"different from replicated paths verified across all ranks: {coalesced_replicated}"
             )
-        return obj_list[0], coalesced_replicated
+        return path, set(coalesced_replicated), list(coalesced_keys)
 
     @staticmethod
     def _infer_replicated(replicated: List[str], app_state: AppState) -> List[str]:
@@ -795,62 +1040,100 @@ class Snapshot:
             return new_replicated
         for key, val in app_state.items():
             if isinstance(val, DDP):
-                ignored = set(cast(List[str], val.parameters_to_ignore))
+                ignored = frozenset(cast(List[str], val.parameters_to_ignore))
                 if not ignored:
                     new_replicated.append(os.path.join(key, "**"))
                     continue
-                for name, _ in itertools.chain(
-                    val.named_parameters(), val.named_buffers()
-                ):
-                    if name not in ignored:
-                        new_replicated.append(os.path.join(key, name))
+                param_names = _ddp_param_names.get(val)
+                if param_names is None:
+                    param_names = tuple(name for name, _ in val.named_parameters())
+                    _ddp_param_names[val] = param_names
+                names = itertools.chain(
+                    param_names, (name for name, _ in val.named_buffers())
+                )
+                # The inferred paths are identical across snapshots. Intern
+                # them so that the copies held by the replicated plan cache
+                # and by subsequent snapshots share storage.
+                new_replicated.extend(
+                    sys.intern(os.path.join(key, name))
+                    for name in names
+                    if name not in ignored
+                )
         return new_replicated
 
     @staticmethod
     def _coalesce_replicated(global_replicated: List[List[str]]) -> Set[str]:
-        verified_replicated = set.intersection(*map(set, global_replicated))
+        if len(global_replicated) == 0:
+            return set()
+        # Intersect incrementally, starting from the smallest list, instead of
+        # materializing a set per rank
+        it = iter(sorted(global_replicated, key=len))
+        verified_replicated = set(next(it))
+        for replicated in it:
+            if len(verified_replicated) == 0:
+                break
+            verified_replicated.intersection_update(replicated)
         return verified_replicated
 
     @staticmethod
     def _gather_keys(keys: List[str], pg_wrapper: PGWrapper) -> List[str]:
-        # pyre-ignore
-        gathered_keys: List[List[str]] = [None] * pg_wrapper.get_world_size()
-        pg_wrapper.all_gather_object(gathered_keys, keys)
+        if pg_wrapper.get_world_size() == 1:
+            return sorted(set(keys))
+        # Exchange the keys as NUL-terminated UTF-8 strings to avoid pickling
+        bufs = pg_wrapper.all_gather_bytes(
+            "".join(f"{key}\x00" for key in keys).encode("utf-8")
+        )
+        gathered_keys = (buf.decode("utf-8").split("\x00")[:-1] for buf in bufs)
         return sorted(set(itertools.chain.from_iterable(gathered_keys)))
 
     @staticmethod
     def _pop_rng_state(
         app_state: AppState,
     ) -> Optional[Tuple[str, RNGState]]:
-        rng_state_items = {
-            key: stateful
-            for key, stateful in app_state.items()
-            if isinstance(stateful, RNGState)
-        }
-        if len(rng_state_items) > 1:
-            raise RuntimeError(
-                "Multiple RNGState objects in app state: "
-                f"{list(rng_state_items.keys())}"
-            )
-        elif len(rng_state_items) == 1:
-            key, stateful = list(rng_state_items.items())[0]
-            del app_state[key]
-            return key, stateful
-        else:
-            return None
+        rng_state_item: Optional[Tuple[str, RNGState]] = None
+        for key, stateful in app_state.items():
+            if not isinstance(stateful, RNGState):
+                continue
+            if rng_state_item is not None:
+                raise RuntimeError(
+                    "Multiple RNGState objects in app state: "
+                    f"{[rng_state_item[0], key]}"
+                )
+            rng_state_item = (key, stateful)
+        if rng_state_item is not None:
+            del app_state[rng_state_item[0]]
+        return rng_state_item
 
     @staticmethod
     def _gather_manifest(manifest: Dict[str, Entry], pg: PGWrapper) -> Dict[str, Any]:
-        # pyre-ignore
-        manifests: List[Dict[str, Entry]] = [None] * pg.get_world_size()
-        pg.all_gather_object(manifests, manifest)
+        if pg.get_rank() != 0:
+            # Replicated primitive entries are identical on all ranks and only
+            # end up in rank 0's manifest. There is no need to gather them from
+            # other ranks.
+            manifest = {
+                logical_path: entry
+                for logical_path, entry in manifest.items()
+                if not (isinstance(entry, PrimitiveEntry) and entry.replicated)
+            }
+        if pg.get_world_size() == 1:
+            manifests = [manifest]
+        else:
+            # Only rank 0 writes the snapshot metadata and needs the global
+            # manifest. Other ranks end up with an empty manifest.
+            bufs = pg.gather_bytes(
+                pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL), dst=0
+            )
+            if bufs is None:
+                return {}
+            manifests = [pickle.loads(buf) for buf in bufs]
         manifests = consolidate_replicated_entries(rank_to_entries=manifests)
 
-        global_manifest = {}
-        for rank, manifest in enumerate(manifests):
-            for logical_path, entry in manifest.items():
-                global_manifest[os.path.join(str(rank), logical_path)] = entry
-        return global_manifest
+        # Logical paths are "/"-separated regardless of the platform
+        return {
+            f"{rank}/{logical_path}": entry
+            for rank, manifest in enumerate(manifests)
+            for logical_path, entry in manifest.items()
+        }
 
 
 class PendingSnapshot:
@@ -860,6 +1143,7 @@ class PendingSnapshot:
         self,
         path: str,
         pending_io_work: PendingIOWork,
+        pg: Optional[dist.ProcessGroup],
         pg_wrapper: PGWrapper,
         metadata: SnapshotMetadata,
         storage: StoragePlugin,
@@ -867,81 +1151,103 @@ class PendingSnapshot:
         storage_options: Optional[Dict[str, Any]] = None,
     ) -> None:
         self.path = path
-        self.pg: Optional[dist.ProcessGroup] = pg_wrapper.pg
-        # pyre-ignore
-        self.exc_info: Optional[Any] = None
-        self._done = False
+        # The caller's process group, as opposed to the gloo process group
+        # that pg_wrapper issues the collectives over
+        self.pg = pg
+        self.rank: int = pg_wrapper.get_rank()
+        # The exception raised while committing the snapshot, in the form of
+        # sys.exc_info(). The traceback objects are dropped since they would
+        # keep the commit thread's frames (and the snapshot data they
+        # reference) alive until .wait() is called. The formatted traceback
+        # is kept in exc_info_str instead.
+        self.exc_info: Optional[Tuple[Type[BaseException], BaseException, None]] = None
+        self.exc_info_str: Optional[str] = None
+        self._done_event = Event()
         self._storage_options = storage_options
 
+        # The snapshot data is passed to the thread rather than stored on
+        # self, since Thread drops its references to it once the commit
+        # completes.
         self.thread = Thread(
             target=self._complete_snapshot,
             kwargs={
-                "path": path,
-                "rank": pg_wrapper.get_rank(),
-                "world_size": pg_wrapper.get_world_size(),
                 "pending_io_work": pending_io_work,
                 "metadata": metadata,
                 "storage": storage,
                 "event_loop": event_loop,
-                "store": get_or_create_store(pg_wrapper=pg_wrapper),
+                "barrier": Snapshot._create_commit_barrier(
+                    path=path, pg_wrapper=pg_wrapper
+                ),
             },
         )
         self.thread.start()
 
     def _complete_snapshot(
         self,
-        path: str,
-        rank: int,
-        world_size: int,
         pending_io_work: PendingIOWork,
         metadata: SnapshotMetadata,
         storage: StoragePlugin,
         event_loop: asyncio.AbstractEventLoop,
-        store: dist.TCPStore,
+        barrier: Optional[LinearBarrier],
     ) -> None:
         # WARNING: do not use any collectives in this method
-
-        # Use a dist.Store-based barrier for synchronization so that the
-        # snapshot can be committed in the background thread.
-        barrier = LinearBarrier(
-            prefix=f"torchsnapshot_{path}",
-            store=store,
-            rank=rank,
-            world_size=world_size,
-            leader_rank=0,
-        )
         try:
-            pending_io_work.sync_complete(event_loop)
-            barrier.arrive(timeout=self.DEFAULT_BARRIER_TIMEOUT)
-
-            if rank == 0:
-                Snapshot._write_snapshot_metadata(
-                    snapshot_metadata=metadata,
+            self._deprioritize_current_thread()
+            event_loop.run_until_complete(
+                Snapshot._commit_snapshot(
+                    pending_io_work=pending_io_work,
+                    metadata=metadata,
                     storage=storage,
-                    event_loop=event_loop,
+                    rank=self.rank,
+                    barrier=barrier,
+                    barrier_timeout=self.DEFAULT_BARRIER_TIMEOUT,
                 )
-            barrier.depart(timeout=self.DEFAULT_BARRIER_TIMEOUT)
+            )
         except Exception as e:
-            barrier.report_error(str(e))
-            self.exc_info = sys.exc_info()
+            self.exc_info_str = traceback.format_exc()
+            _drop_tracebacks(e)
+            self.exc_info = (type(e), e, None)
             logger.warning(
                 f"Encountered exception while taking snapshot asynchronously:\n{e}"
             )
         finally:
-            storage.sync_close(event_loop=event_loop)
             event_loop.close()
-        self._done = True
+            self._done_event.set()
+
+    @staticmethod
+    def _deprioritize_current_thread() -> None:
+        # Keep the commit thread from competing with the training loop for
+        # CPU and disk. On Linux, affinity, nice values and I/O priorities
+        # are per-thread attributes, so only the commit thread (and threads
+        # it spawns) is affected.
+        if not sys.platform.startswith("linux"):
+            return
+        try:
+            cpuset = get_snapshot_cpuset()
+            if cpuset is not None:
+                cpuset &= os.sched_getaffinity(0)
+                if len(cpuset) != 0:
+                    os.sched_setaffinity(0, cpuset)
+            os.nice(_COMMIT_THREAD_NICENESS)
+            psutil.Process(get_native_id()).ionice(
+                psutil.IOPRIO_CLASS_BE, value=_COMMIT_THREAD_IOPRIO
+            )
+        except (OSError, ValueError, psutil.Error) as e:
+            # Deprioritization is best-effort and must not fail the commit
+            logger.warning(f"Failed to deprioritize the snapshot commit thread: {e}")
 
     def wait(self) -> Snapshot:
         self.thread.join()
-        if self.exc_info is not None:
-            formatted = "".join(traceback.format_exception(*self.exc_info))
+        if self.exc_info_str is not None:
             raise RuntimeError(
-                f"Encountered exception while taking snapshot asynchronously:\n{formatted}"
+                f"Encountered exception while taking snapshot asynchronously:\n{self.exc_info_str}"
             )
         return Snapshot(
             path=self.path, pg=self.pg, storage_options=self._storage_options
         )
 
     def done(self) -> bool:
-        return self._done
+        return self._done_event.is_set()
+
+    def wait_done(self, timeout: Optional[float] = None) -> bool:
+        return self._done_event.wait(timeout=timeout)